@@ -1,10 +1,12 @@
 import threading
 import json
+from collections.abc import Sequence
 from pathlib import Path
 import logging
 from config import FILE_ERRORS, DATA_ERRORS, IMAGE_ERRORS, EXCEL_ERRORS
 from backend.backend_config import DEFAULT_PATHS, ORDER_CONFIG
-from data_engine.data_reader import DataReader
+from backend.catalog_service import get_catalog_service
+from backend.search_index import SearchIndex, SearchSession
 from utils.file_utils import open_folder
 from pathlib import Path
 import json
@@ -13,6 +15,19 @@ import json
 logger = logging.getLogger(__name__)  # <-- Добавлено
 CONFIG_FILE = Path("user_paths.json")
 
+class ProductsView(Sequence):
+    """Представление списка товаров только для чтения: доступ по индексу без копирования"""
+
+    def __init__(self, products: list[dict]):
+        self._products = products
+
+    def __len__(self):
+        return len(self._products)
+
+    def __getitem__(self, index):
+        return self._products[index]
+
+
 class PurchaseTableBackend:
     def __init__(self):
         self.config_file = CONFIG_FILE
@@ -23,10 +38,16 @@ class PurchaseTableBackend:
         self.images_dir = saved_paths.get("images_dir", DEFAULT_PATHS["images_dir"])
         self.output_dir = saved_paths.get("output_dir", DEFAULT_PATHS["output_dir"])
 
+        self.catalog = get_catalog_service()
         self.data_reader = None
         self.all_products = []
+        self.products_by_article = {}  # Индекс {артикул: товар} для поиска за O(1)
+        self.search_index = SearchIndex([])
         self.order_items = {}
 
+        # Открывать папку с результатом после генерации (отключается в консольном режиме)
+        self.open_output_folder = True
+
         # Колбэки для уведомления UI
         self.status_callback = None
         self.message_callback = None
@@ -98,9 +119,18 @@ class PurchaseTableBackend:
             return False
 
         try:
-            self.data_reader = DataReader(self.database_file, self.images_dir)
-            if self.data_reader.load_database():
-                self.all_products = self.data_reader.get_all_products()
+            data_reader = self.catalog.acquire(self.database_file, self.images_dir)
+            if data_reader:
+                if data_reader is self.data_reader:
+                    # Каталог не менялся — список товаров и поисковый индекс актуальны
+                    self.catalog.release(data_reader)
+                else:
+                    # Освобождаем ссылку на предыдущий каталог, чтобы он мог выгрузиться
+                    if self.data_reader:
+                        self.catalog.release(self.data_reader)
+                    self.data_reader = data_reader
+                    self.all_products = self.data_reader.get_all_products()
+                    self._index_products()
                 self.update_status(f"Загружено {len(self.all_products)} товаров из базы данных")
                 return True
             else:
@@ -112,23 +142,35 @@ class PurchaseTableBackend:
             self.update_status("Ошибка загрузки базы данных")
             return False
 
+    def _index_products(self):
+        """Перестроение индексов по загруженному списку товаров."""
+        self.products_by_article = {product['article']: product for product in self.all_products}
+        self.search_index = SearchIndex(self.all_products)
+
     def generate_availability_list_async(self):
         """Асинхронная генерация листа наличия ПО КАЖДОМУ ПОСТАВЩИКУ."""
+        # Запуск в отдельном потоке
+        thread = threading.Thread(target=self.generate_availability_list)
+        thread.daemon = True
+        thread.start()
 
-        def generate_thread():
-            try:
-                self.update_status("Генерация листов наличия...")
+    def generate_availability_list(self) -> tuple[list[str], list[str]]:
+        """
+        Генерация листов наличия по каждому поставщику в текущем потоке.
 
-                # Инициализируем генератор Excel и читатель данных
-                from data_engine.excel_generator import ExcelGenerator
-                from data_engine.data_reader import DataReader
+        :return: (созданные файлы, ошибки)
+        """
+        path_error = self._check_catalog_paths()
+        if path_error:
+            return [], [path_error]
 
-                excel_generator = ExcelGenerator(output_dir=self.output_dir)
-                data_reader = DataReader(self.database_file, self.images_dir)
+        try:
+            self.update_status("Генерация листов наличия...")
 
-                if not data_reader.load_database():
-                    raise Exception("Не удалось загрузить базу данных")
+            # Берём общий каталог; книги строит планировщик
+            from backend.generation_scheduler import generate_workbooks
 
+            with self.catalog.lease(self.database_file, self.images_dir) as data_reader:
                 # Получаем все товары
                 all_products = data_reader.get_all_products()
                 if not all_products:
@@ -142,42 +184,32 @@ class PurchaseTableBackend:
                         suppliers_dict[supplier] = []
                     suppliers_dict[supplier].append(product)
 
-                files = []
-                errors = []
-
-                # Генерируем отдельный файл для КАЖДОГО поставщика
+                # Формируем позиции для КАЖДОГО поставщика (изображения обрабатываются при генерации)
+                jobs = {}
+                prepare_errors = {}
                 for supplier_name, supplier_items in suppliers_dict.items():
                     try:
-                        # Формируем данные для генератора
-                        supplier_data = {
-                            'supplier': supplier_name,
-                            'items': []
-                        }
-
-                        for product in supplier_items:
-                            # Обрабатываем изображение
-                            processed_image = data_reader.process_image(product['article'])
-                            supplier_data['items'].append({
-                                'article': product['article'],
-                                'name': product['name'],
-                                'price': float(product['price']),
-                                'processed_image': processed_image
-                            })
-
-                        # Генерируем файл
-                        file_path = excel_generator.generate_general_table(supplier_data)
-                        if file_path:
-                            files.append(file_path)
-
+                        jobs[supplier_name] = [{
+                            'article': product['article'],
+                            'name': product['name'],
+                            'price': float(product['price'])
+                        } for product in supplier_items]
                     except Exception as e:
-                        errors.append(f"Ошибка генерации для {supplier_name}: {str(e)}")
+                        prepare_errors[supplier_name] = [f"Ошибка генерации для {supplier_name}: {str(e)}"]
+
+                # Генерируем отдельный файл для каждого поставщика, книги строятся параллельно
+                results = generate_workbooks('availability', jobs, data_reader, self.output_dir,
+                                             on_done=self._report_workbook_done)
+                files, errors, embedded = self._collect_results(suppliers_dict, results, prepare_errors)
 
                 if files:
-                    self.update_status(f"Создано файлов: {len(files)}")
-                    open_folder(self.output_dir)
+                    self.update_status(f"Создано файлов: {len(files)}; {self._format_embed_report(embedded)}")
+                    if self.open_output_folder:
+                        open_folder(self.output_dir)
                     message = f"Успешно создано {len(files)} файлов:\n"
                     for file_path in files:
                         message += f"• {Path(file_path).name}\n"
+                    message += f"\n{self._format_embed_report(embedded)}"
                     if errors:
                         message += f"\nОшибок: {len(errors)}"
                     self.show_success("Готово", message)
@@ -186,16 +218,73 @@ class PurchaseTableBackend:
                     self.show_error("Ошибка", f"Не удалось создать файлы:\n{error_text}")
                     self.update_status("Ошибка генерации")
 
-            except Exception as e:
-                error_msg = EXCEL_ERRORS['EXCEL_GENERATION_ERROR'].format(str(e))
-                self.show_error("Ошибка", error_msg)
-                self.update_status("Ошибка генерации")
-                logger.error(error_msg)
+                # Все фото каталога уже обработаны — удаляем миниатюры исчезнувших файлов
+                data_reader.prune_thumbnails()
+                return files, errors
 
-        # Запуск в отдельном потоке
-        thread = threading.Thread(target=generate_thread)
-        thread.daemon = True
-        thread.start()
+        except Exception as e:
+            error_msg = EXCEL_ERRORS['EXCEL_GENERATION_ERROR'].format(str(e))
+            self.show_error("Ошибка", error_msg)
+            self.update_status("Ошибка генерации")
+            logger.error(error_msg)
+            return [], [error_msg]
+
+    def _check_catalog_paths(self) -> str | None:
+        """
+        Проверка файла базы и папки изображений перед генерацией, чтобы об их отсутствии
+        сообщалось прямо, а не как об ошибке создания Excel.
+
+        :return: Текст ошибки (уже показанной пользователю) или None, если пути в порядке.
+        """
+        if not self.database_file or not Path(self.database_file).is_file():
+            error_msg = FILE_ERRORS['DATABASE_NOT_FOUND'].format(self.database_file)
+            status = "Ошибка: база данных не найдена"
+        elif not self.images_dir or not Path(self.images_dir).is_dir():
+            error_msg = FILE_ERRORS['IMAGES_DIR_NOT_FOUND'].format(self.images_dir)
+            status = "Ошибка: папка изображений не найдена"
+        else:
+            return None
+        self.show_error("Ошибка", error_msg)
+        self.update_status(status)
+        logger.error(error_msg)
+        return error_msg
+
+    def _report_workbook_done(self, supplier_name, file_path, error, report, done, total):
+        """Статус по мере готовности книг поставщиков."""
+        state = "ошибка" if error else "готово"
+        if report:
+            state += f", {self._format_embed_report(report)}"
+        self.update_status(f"Генерация: {done}/{total} ({supplier_name} — {state})")
+
+    @staticmethod
+    def _format_embed_report(report: dict) -> str:
+        """Текст отчёта по встроенным фото: количество, уникальные и объём."""
+        return (f"фото: {report['images']} (уникальных {report['unique']}), "
+                f"{report['bytes'] / 1024 / 1024:.1f} МБ")
+
+    @staticmethod
+    def _collect_results(suppliers, results, prepare_errors) -> tuple[list[str], list[str], dict]:
+        """
+        Сбор файлов и ошибок в порядке поставщиков.
+
+        :param suppliers: Поставщики в исходном порядке.
+        :param results: {поставщик: (путь или None, ошибка или None, отчёт по фото или None)} от планировщика.
+        :param prepare_errors: {поставщик: [ошибки подготовки позиций]}.
+        :return: (файлы, ошибки, суммарный отчёт по встроенным фото {'images', 'unique', 'bytes'})
+        """
+        files = []
+        errors = []
+        embedded = {'images': 0, 'unique': 0, 'bytes': 0}
+        for supplier_name in suppliers:
+            errors.extend(prepare_errors.get(supplier_name, []))
+            file_path, error, report = results.get(supplier_name, (None, None, None))
+            if file_path:
+                files.append(file_path)
+            if error:
+                errors.append(f"Ошибка генерации для {supplier_name}: {error}")
+            for key, value in (report or {}).items():
+                embedded[key] += value
+        return files, errors, embedded
 
     def load_default_order(self) -> int:
         """Загрузка заказа по умолчанию из конфига с поддержкой поставщиков."""
@@ -226,10 +315,7 @@ class PurchaseTableBackend:
 
     def find_product_by_article(self, article: str) -> dict | None:
         """Найти товар по артикулу"""
-        for product in self.all_products:
-            if product['article'] == article:
-                return product
-        return None
+        return self.products_by_article.get(article)
 
     def search_products(self, search_text: str) -> list[dict]:
         """Поиск товаров по артикулу или названию"""
@@ -237,14 +323,12 @@ class PurchaseTableBackend:
         if len(search_text) < ORDER_CONFIG['min_search_length']:
             return []
 
-        found_products = []
-        for product in self.all_products:
-            article = product.get('article', '').lower()
-            name = product.get('name', '').lower()
-            if search_text in article or search_text in name:
-                found_products.append(product)
+        return self.search_index.search(search_text, ORDER_CONFIG['max_search_results'])
 
-        return found_products[:ORDER_CONFIG['max_search_results']]
+    def create_search_session(self) -> SearchSession:
+        """Создать сеанс поиска, переиспользующий результаты между нажатиями клавиш"""
+        return SearchSession(self.search_index, ORDER_CONFIG['min_search_length'],
+                             ORDER_CONFIG['max_search_results'])
 
     def add_product_to_order(self, product: dict) -> bool:
         """Добавить товар в заказ. Автоматически находит всех поставщиков."""
@@ -301,9 +385,6 @@ class PurchaseTableBackend:
 
     def find_all_suppliers_for_article(self, article: str) -> list[dict]:
         """Найти всех поставщиков для заданного артикула."""
-        data_reader = DataReader(self.database_file, self.images_dir)
-        if not data_reader.load_database():
-            return []
         suppliers = self.data_reader.get_product_info(article) if self.data_reader else []
         return suppliers if suppliers else []
 
@@ -338,117 +419,146 @@ class PurchaseTableBackend:
         """Получить ВСЕ товары из базы данных для отображения при пустом поиске."""
         return self.all_products.copy()  # Возвращаем копию, чтобы избежать неожиданных изменений
 
+    def get_products_view(self) -> ProductsView:
+        """Получить ВСЕ товары без копирования списка (для виртуализированного отображения)."""
+        return ProductsView(self.all_products)
+
+    def get_photo_version(self, article: str) -> int | None:
+        """
+        Версия фото товара (время изменения файла) для кэша изображений UI.
+        Обращается к файловой системе — вызывается из фонового потока загрузки фото UI.
+        """
+        if not self.data_reader:
+            return None
+        return self.data_reader.get_image_mtime(article)
+
+    def get_item_photo(self, article: str):
+        """
+        Фото товара по запросу (обработанная миниатюра PIL.Image).
+        Потокобезопасно — вызывается из фонового потока загрузки фото UI.
+
+        :return: Изображение или None, если фото нет.
+        """
+        if not self.data_reader:
+            return None
+        return self.data_reader.process_image(article)
+
     def get_order_items_for_display(self) -> list[dict]:
-        """Получить список товаров для отображения в UI, включая фото и сумму."""
-        display_items = []
-        for article, item_data in self.order_items.items():
-            product = item_data['product']
-            quantity = item_data['quantity']
-            enabled = item_data['enabled']
-            selected_supplier = item_data['selected_supplier']
-
-            try:
-                price = float(product.get('price', 0))
-            except (ValueError, TypeError):
-                price = 0.0
-
-            # Рассчитываем сумму
-            total_sum = price * quantity
-
-            # Получаем изображение
-            processed_image = None
-            if self.data_reader:
-                processed_image = self.data_reader.process_image(article)
-
-            display_items.append({
-                'article': article,
-                'name': product.get('name', 'Неизвестно'),
-                'price': price,
-                'quantity': quantity,
-                'enabled': enabled,
-                'selected_supplier': selected_supplier,
-                'all_suppliers': [s['supplier'] for s in item_data['all_suppliers']],
-                'photo': processed_image,  # ← Добавляем фото
-                'total_sum': total_sum  # ← Добавляем сумму
-            })
-
-        return display_items
+        """
+        Получить список товаров для отображения в UI, включая сумму.
+        Только данные заказа — фото загружаются отдельно по запросу через get_item_photo().
+        """
+        return [self._display_item(article, item_data) for article, item_data in self.order_items.items()]
+
+    def get_order_item_for_display(self, article: str) -> dict | None:
+        """Данные одной позиции заказа для UI (поставщики, цена, количество) или None."""
+        item_data = self.order_items.get(article)
+        if item_data is None:
+            return None
+        return self._display_item(article, item_data)
+
+    @staticmethod
+    def _display_item(article: str, item_data: dict) -> dict:
+        """Проекция позиции заказа для отображения."""
+        product = item_data['product']
+        quantity = item_data['quantity']
+
+        try:
+            price = float(product.get('price', 0))
+        except (ValueError, TypeError):
+            price = 0.0
+
+        return {
+            'article': article,
+            'name': product.get('name', 'Неизвестно'),
+            'price': price,
+            'quantity': quantity,
+            'enabled': item_data['enabled'],
+            'selected_supplier': item_data['selected_supplier'],
+            'all_suppliers': [s['supplier'] for s in item_data['all_suppliers']],
+            'total_sum': price * quantity  # ← Добавляем сумму
+        }
 
     def generate_purchase_list_async(self):
         """Асинхронная генерация листа закупки с использованием ExcelGenerator."""
+        # Запуск в отдельном потоке
+        thread = threading.Thread(target=self.generate_purchase_list)
+        thread.daemon = True
+        thread.start()
 
-        def generate_thread():
-            try:
-                self.update_status("Генерация листа закупки...")
+    def generate_purchase_list(self) -> tuple[list[str], list[str]]:
+        """
+        Генерация листов закупки по поставщикам в текущем потоке.
 
-                # Формируем заказ, сгруппированный по ПОСТАВЩИКАМ
-                suppliers_order = {}  # {поставщик: {артикул: количество, ...}}
-                for article, item_data in self.order_items.items():
-                    if not (item_data['enabled'] and item_data['quantity'] > 0):
-                        continue
+        :return: (созданные файлы, ошибки)
+        """
+        try:
+            self.update_status("Генерация листа закупки...")
 
-                    selected_supplier = item_data['selected_supplier']
-                    if selected_supplier not in suppliers_order:
-                        suppliers_order[selected_supplier] = {}
+            # Формируем заказ, сгруппированный по ПОСТАВЩИКАМ
+            suppliers_order = {}  # {поставщик: {артикул: количество, ...}}
+            for article, item_data in self.order_items.items():
+                if not (item_data['enabled'] and item_data['quantity'] > 0):
+                    continue
 
-                    suppliers_order[selected_supplier][article] = item_data['quantity']
+                selected_supplier = item_data['selected_supplier']
+                if selected_supplier not in suppliers_order:
+                    suppliers_order[selected_supplier] = {}
 
-                if not suppliers_order:
-                    self.show_error("Предупреждение", "Нет товаров для закупки")
-                    self.update_status("Нет товаров для закупки")
-                    return
+                suppliers_order[selected_supplier][article] = item_data['quantity']
 
-                # Инициализируем генератор Excel
-                from data_engine.excel_generator import ExcelGenerator
-                excel_generator = ExcelGenerator(output_dir=self.output_dir)
+            if not suppliers_order:
+                self.show_error("Предупреждение", "Нет товаров для закупки")
+                self.update_status("Нет товаров для закупки")
+                return [], ["Нет товаров для закупки"]
 
-                files = []
-                errors = []
+            path_error = self._check_catalog_paths()
+            if path_error:
+                return [], [path_error]
 
-                # Генерируем отдельный файл для КАЖДОГО поставщика
+            # Берём общий каталог; книги строит планировщик
+            from backend.generation_scheduler import generate_workbooks
+            with self.catalog.lease(self.database_file, self.images_dir) as data_reader:
+                # Формируем позиции для КАЖДОГО поставщика (изображения обрабатываются при генерации)
+                jobs = {}
+                prepare_errors = {}
                 for supplier_name, supplier_items in suppliers_order.items():
+                    supplier_errors = prepare_errors.setdefault(supplier_name, [])
                     try:
-                        # Формируем данные для генератора
-                        supplier_data = {
-                            'supplier': supplier_name,
-                            'items': []
-                        }
-
-                        data_reader = DataReader(self.database_file, self.images_dir)
-                        if not data_reader.load_database():
-                            raise Exception("Не удалось загрузить базу данных")
-
+                        items = []
                         for article, quantity in supplier_items.items():
                             # Находим полную информацию о товаре у этого поставщика
-                            all_suppliers = self.find_all_suppliers_for_article(article)
+                            all_suppliers = data_reader.get_product_info(article) or []
                             selected_product = next((p for p in all_suppliers if p['supplier'] == supplier_name), None)
                             if selected_product:
-                                # Обрабатываем изображение
-                                processed_image = data_reader.process_image(article)
-                                supplier_data['items'].append({
+                                items.append({
                                     'article': article,
                                     'name': selected_product['name'],
                                     'price': float(selected_product['price']),
-                                    'quantity': quantity,
-                                    'processed_image': processed_image
+                                    'quantity': quantity
                                 })
                             else:
-                                errors.append(f"Товар {article} не найден у поставщика {supplier_name}")
+                                supplier_errors.append(f"Товар {article} не найден у поставщика {supplier_name}")
 
-                        if supplier_data['items']:
-                            # Генерируем файл
-                            file_path = excel_generator.generate_table(supplier_data)
-                            files.append(file_path)
+                        if items:
+                            jobs[supplier_name] = items
 
                     except Exception as e:
-                        errors.append(f"Ошибка генерации для {supplier_name}: {str(e)}")
+                        supplier_errors.append(f"Ошибка генерации для {supplier_name}: {str(e)}")
+
+                # Генерируем отдельный файл для каждого поставщика, книги строятся параллельно
+                results = generate_workbooks('purchase', jobs, data_reader, self.output_dir,
+                                             on_done=self._report_workbook_done)
+                files, errors, embedded = self._collect_results(suppliers_order, results, prepare_errors)
 
                 if files:
-                    self.update_status(f"Создано файлов: {len(files)}")
-                    open_folder(self.output_dir)
+                    self.update_status(f"Создано файлов: {len(files)}; {self._format_embed_report(embedded)}")
+                    if self.open_output_folder:
+                        open_folder(self.output_dir)
                     message = f"Успешно создано {len(files)} файлов:\n"
                     for file_path in files:
                         message += f"• {Path(file_path).name}\n"
+                    message += f"\n{self._format_embed_report(embedded)}"
                     if errors:
                         message += f"\nОшибок: {len(errors)}"
                     self.show_success("Готово", message)
@@ -456,15 +566,12 @@ class PurchaseTableBackend:
                     error_text = "\n".join(errors) if errors else "Неизвестная ошибка"
                     self.show_error("Ошибка", f"Не удалось создать файлы:\n{error_text}")
                     self.update_status("Ошибка генерации")
+                return files, errors
 
-            except Exception as e:
-                self.show_error("Ошибка", f"Произошла ошибка:\n{str(e)}")
-                self.update_status("Ошибка генерации")
-
-        # Запуск в отдельном потоке
-        thread = threading.Thread(target=generate_thread)
-        thread.daemon = True
-        thread.start()
+        except Exception as e:
+            self.show_error("Ошибка", f"Произошла ошибка:\n{str(e)}")
+            self.update_status("Ошибка генерации")
+            return [], [str(e)]
 
     def load_order_from_json(self, filename: str) -> bool:
         """Загрузить заказ из JSON файла"""
@@ -20,4 +20,14 @@ ORDER_CONFIG = {
     'max_quantity': 9999,        # Максимально допустимое количество товара
     'min_search_length': 2,      # Минимальная длина строки поиска
     'max_search_results': 20     # Максимальное количество результатов поиска
-}
\ No newline at end of file
+}
+
+# === Параллельная генерация книг по поставщикам ===
+GENERATION_CONFIG = {
+    'max_workers': None,         # Максимум процессов (None — по числу ядер)
+    'worker_memory_mb': 256,     # Оценка памяти одного процесса генерации
+    'memory_limit_mb': 1024,     # Общий лимит памяти процессов генерации
+    'min_parallel_jobs': 2,      # Меньше книг — генерация в текущем процессе
+    'min_parallel_items': 5000   # Меньше позиций во всех книгах — тоже в текущем процессе:
+                                 # запуск процессов (импорт pandas, openpyxl, PIL) дороже выигрыша
+}
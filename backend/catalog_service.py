@@ -0,0 +1,98 @@
+"""
+Общий для процесса сервис каталога: один загруженный DataReader на все пути backend.
+"""
+
+import threading
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from data_engine.data_reader import DataReader
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogService:
+    """
+    Владеет одним загруженным DataReader и выдаёт его всем потребителям.
+    База перечитывается только при смене файла, его размера/времени изменения или папки изображений.
+    Ссылки считаются отдельно для каждого DataReader: после перезагрузки базы потребители
+    старого каталога освобождают именно его, и он выгружается, когда уходит последний из них.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._data_reader = None
+        self._key = None
+        self._refs = {}
+
+    def acquire(self, database_file: str, images_dir: str) -> DataReader | None:
+        """
+        Получить общий DataReader, при необходимости загрузив базу.
+        Каждому успешному вызову должен соответствовать вызов release() с тем же DataReader.
+
+        :param database_file: Путь к Excel-файлу базы данных.
+        :param images_dir: Путь к папке с изображениями.
+        :return: Загруженный DataReader или None, если базу загрузить не удалось.
+        :raises FileNotFoundError: Если файл базы или папка с изображениями не существуют.
+        """
+        with self._lock:
+            key = self._make_key(database_file, images_dir)
+            if self._data_reader is None or key != self._key:
+                data_reader = DataReader(database_file, images_dir)
+                if not data_reader.load_database():
+                    return None
+                self._data_reader = data_reader
+                self._key = key
+                logger.info(f"Каталог загружен: {database_file}")
+            data_reader = self._data_reader
+            self._refs[data_reader] = self._refs.get(data_reader, 0) + 1
+            return data_reader
+
+    def release(self, data_reader: DataReader):
+        """
+        Освободить ссылку, полученную через acquire().
+
+        :param data_reader: DataReader, который вернул acquire().
+        """
+        with self._lock:
+            refs = self._refs.get(data_reader, 0)
+            if refs == 0:
+                return
+            if refs > 1:
+                self._refs[data_reader] = refs - 1
+                return
+            del self._refs[data_reader]
+            if data_reader is self._data_reader:
+                self._data_reader = None
+                self._key = None
+                logger.info("Каталог выгружен: нет активных потребителей")
+
+    @contextmanager
+    def lease(self, database_file: str, images_dir: str):
+        """
+        Контекстный менеджер над acquire()/release() для фоновых задач.
+
+        :raises Exception: Если базу загрузить не удалось.
+        """
+        data_reader = self.acquire(database_file, images_dir)
+        if data_reader is None:
+            raise Exception("Не удалось загрузить базу данных")
+        try:
+            yield data_reader
+        finally:
+            self.release(data_reader)
+
+    @staticmethod
+    def _make_key(database_file: str, images_dir: str) -> tuple:
+        """Ключ актуальности каталога: путь, размер и время изменения базы, папка изображений."""
+        database_path = Path(database_file).resolve()
+        stat = database_path.stat()
+        return str(database_path), stat.st_size, stat.st_mtime_ns, str(Path(images_dir).resolve())
+
+
+_catalog_service = CatalogService()
+
+
+def get_catalog_service() -> CatalogService:
+    """Получить общий для процесса сервис каталога."""
+    return _catalog_service
@@ -0,0 +1,150 @@
+"""
+Параллельная генерация книг Excel по поставщикам в пуле процессов.
+"""
+
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from backend.backend_config import GENERATION_CONFIG
+from config import FILE_ERRORS
+from data_engine.data_reader import DataReader
+from data_engine.excel_generator import ExcelGenerator
+
+logger = logging.getLogger(__name__)
+
+# Виды книг: метод ExcelGenerator для каждого
+TABLE_METHODS = {
+    'purchase': 'generate_table',
+    'availability': 'generate_general_table',
+}
+
+# Состояние процесса-обработчика: DataReader только для изображений, генератор (кэш закодированных фото)
+# и ошибка инициализации, которая сообщается в каждой задаче
+_worker_reader = None
+_worker_generator = None
+_worker_error = None
+
+
+def build_supplier_workbook(data_reader, excel_generator, kind: str, supplier_name: str, items: list[dict],
+                            workers: int | None = None) -> tuple[str, dict | None]:
+    """
+    Обработка фото и создание книги одного поставщика. Фото обрабатываются по мере записи строк:
+    ExcelGenerator забирает их из итератора по одному, поэтому в памяти нет фото всего поставщика.
+
+    :param kind: Вид книги ('purchase' или 'availability').
+    :param items: Позиции без изображений (словари для ExcelGenerator без 'processed_image').
+    :param workers: Потоков обработки изображений (None — по IMAGE_CONFIG).
+    :return: (путь к созданному файлу, отчёт по встроенным фото {'images', 'unique', 'bytes'}).
+    """
+    supplier_data = {
+        'supplier': supplier_name,
+        'items': items,
+        'images': data_reader.process_images([item['article'] for item in items], workers, encoded=True)
+    }
+    file_path = getattr(excel_generator, TABLE_METHODS[kind])(supplier_data)
+    # Отчёт забирается из генератора: в процессе пула генератор живёт дольше одной книги
+    return file_path, excel_generator.embed_report.pop(file_path, None)
+
+
+def _init_worker(database_file: str, images_dir: str, output_dir: str):
+    """
+    Инициализация процесса. Задачам нужны только изображения, поэтому база не загружается:
+    DataReader без load_database() лишь проверяет пути и индексирует папку фото при первом обращении.
+    Ошибка не пробрасывается — иначе пул ломается и все книги получают «process terminated abruptly».
+    """
+    global _worker_reader, _worker_generator, _worker_error
+    try:
+        _worker_reader = DataReader(database_file, images_dir)
+        _worker_generator = ExcelGenerator(output_dir=output_dir)
+    except Exception as e:
+        _worker_error = str(e)
+
+
+def _run_job(kind: str, supplier_name: str, items: list[dict], image_workers: int) -> tuple[str, dict | None]:
+    """
+    Задача процесса: книга одного поставщика.
+
+    :param image_workers: Потоков обработки фото — доля ядер на процесс, чтобы крупный поставщик
+                          не обрабатывал фото в одном потоке, пока остальные процессы простаивают.
+    """
+    if _worker_error is not None:
+        raise Exception(_worker_error)
+    return build_supplier_workbook(_worker_reader, _worker_generator, kind, supplier_name, items,
+                                   workers=image_workers)
+
+
+def worker_count(jobs_count: int, items_count: int) -> int:
+    """
+    Количество процессов: не больше ядер, поставщиков и лимита памяти из GENERATION_CONFIG.
+    Небольшие генерации идут в текущем процессе — запуск процессов обходится дороже выигрыша.
+
+    :param jobs_count: Количество книг.
+    :param items_count: Количество позиций (фото) во всех книгах.
+    """
+    if jobs_count < GENERATION_CONFIG['min_parallel_jobs'] or items_count < GENERATION_CONFIG['min_parallel_items']:
+        return 1
+    cpu_limit = GENERATION_CONFIG['max_workers'] or os.cpu_count() or 1
+    memory_limit = GENERATION_CONFIG['memory_limit_mb'] // GENERATION_CONFIG['worker_memory_mb']
+    return max(1, min(cpu_limit, memory_limit, jobs_count))
+
+
+def generate_workbooks(kind: str, jobs: dict[str, list[dict]], data_reader, output_dir: str,
+                       on_done=None) -> dict[str, tuple[str | None, str | None, dict | None]]:
+    """
+    Создание книг для всех поставщиков. Книги независимы и строятся параллельно в процессах;
+    при одном процессе — последовательно в текущем, с уже загруженным каталогом.
+
+    :param kind: Вид книги ('purchase' или 'availability').
+    :param jobs: {поставщик: позиции без изображений}.
+    :param data_reader: Загруженный DataReader (для последовательного режима и путей каталога).
+    :raises FileNotFoundError: Если нет файла базы или папки изображений (до запуска процессов).
+    :param output_dir: Папка для файлов.
+    :param on_done: Функция (поставщик, путь или None, ошибка или None, отчёт по фото или None,
+                    готово, всего), вызывается по мере завершения каждой книги.
+    :return: {поставщик: (путь к файлу или None, текст ошибки или None, отчёт по встроенным фото или None)}
+             в порядке jobs.
+    """
+    results = {}
+    total = len(jobs)
+
+    def finish(supplier_name, result, error):
+        file_path, report = result or (None, None)
+        results[supplier_name] = (file_path, error, report)
+        if on_done:
+            on_done(supplier_name, file_path, error, report, len(results), total)
+
+    workers = worker_count(total, sum(len(items) for items in jobs.values()))
+    if workers <= 1:
+        excel_generator = ExcelGenerator(output_dir=output_dir)
+        for supplier_name, items in jobs.items():
+            try:
+                finish(supplier_name, build_supplier_workbook(data_reader, excel_generator, kind, supplier_name, items), None)
+            except Exception as e:
+                finish(supplier_name, None, str(e))
+        return {supplier_name: results[supplier_name] for supplier_name in jobs}
+
+    # Пути проверяются до запуска пула, чтобы ошибка была одна и понятная
+    if not Path(data_reader.database_path).is_file():
+        raise FileNotFoundError(FILE_ERRORS['DATABASE_NOT_FOUND'].format(data_reader.database_path))
+    if not Path(data_reader.images_dir).is_dir():
+        raise FileNotFoundError(FILE_ERRORS['IMAGES_DIR_NOT_FOUND'].format(data_reader.images_dir))
+    Path(output_dir).mkdir(exist_ok=True)
+
+    image_workers = max(1, (os.cpu_count() or 1) // workers)
+    logger.info(f"Генерация {total} книг в {workers} процессах, по {image_workers} потоков обработки фото")
+    # spawn на всех ОС: процесс с Tk и фоновыми потоками нельзя безопасно форкать
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker,
+                             initargs=(str(data_reader.database_path), str(data_reader.images_dir),
+                                       str(output_dir))) as executor:
+        futures = {executor.submit(_run_job, kind, supplier_name, items, image_workers): supplier_name
+                   for supplier_name, items in jobs.items()}
+        for future in as_completed(futures):
+            try:
+                finish(futures[future], future.result(), None)
+            except Exception as e:
+                finish(futures[future], None, str(e))
+
+    return {supplier_name: results[supplier_name] for supplier_name in jobs}
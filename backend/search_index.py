@@ -0,0 +1,174 @@
+"""
+Инвертированный триграммный индекс для поиска товаров по подстроке артикула или названия.
+"""
+
+import logging
+import threading
+from array import array
+
+logger = logging.getLogger(__name__)
+
+# Длина n-граммы индекса. Более короткие запросы проверяются полным перебором
+NGRAM_SIZE = 3
+
+# Пересечение прекращается, когда следующий список длиннее кандидатов во столько раз:
+# оставшихся кандидатов дешевле проверить точным поиском подстроки
+INTERSECT_RATIO = 8
+
+
+class SearchIndex:
+    """
+    Индекс строится лениво — при первом поиске от триграммы (или явном вызове build()), поэтому загрузка
+    базы и режимы без поиска его не оплачивают; запросы короче триграммы проверяются перебором без индекса. Списки товаров по триграммам хранятся как array('I')
+    с возрастающими номерами товаров. Для запроса пересекаются списки его триграмм, после чего
+    кандидаты проверяются точным поиском подстроки — результат совпадает с полным перебором.
+    """
+
+    def __init__(self, products: list[dict]):
+        """
+        :param products: Список товаров (словарей с ключами 'article' и 'name').
+        """
+        self.products = products
+        self._texts = None
+        self._postings = None
+        self._lock = threading.Lock()
+
+    def build(self):
+        """Построение индекса, если он ещё не построен. Потокобезопасно."""
+        if self._postings is not None:
+            return
+        with self._lock:
+            if self._postings is not None:
+                return
+            texts = []
+            postings = {}
+            for product_id, product in enumerate(self.products):
+                article = str(product.get('article', '')).lower()
+                name = str(product.get('name', '')).lower()
+                texts.append((article, name))
+                grams = {article[start:start + NGRAM_SIZE] for start in range(len(article) - NGRAM_SIZE + 1)}
+                grams.update(name[start:start + NGRAM_SIZE] for start in range(len(name) - NGRAM_SIZE + 1))
+                for gram in grams:
+                    posting = postings.get(gram)
+                    if posting is None:
+                        posting = postings[gram] = array('I')
+                    posting.append(product_id)
+
+            self._texts = texts
+            self._postings = postings
+            logger.info(f"Поисковый индекс построен: {len(texts)} товаров, {len(postings)} триграмм")
+
+    def matches(self, product_id: int, query: str) -> bool:
+        """
+        Проверка, содержит ли артикул или название товара подстроку query (в нижнем регистре).
+        До построения индекса строки берутся прямо из товара — короткие запросы индекс не ждут.
+        """
+        texts = self._texts
+        if texts is None:
+            product = self.products[product_id]
+            article = str(product.get('article', '')).lower()
+            name = str(product.get('name', '')).lower()
+        else:
+            article, name = texts[product_id]
+        return query in article or query in name
+
+    def candidates(self, query: str) -> list[int] | None:
+        """
+        Кандидаты для запроса по пересечению списков триграмм.
+
+        :param query: Запрос в нижнем регистре.
+        :return: Отсортированные номера товаров или None, если запрос короче триграммы.
+        """
+        if len(query) < NGRAM_SIZE:
+            return None
+        self.build()
+
+        postings = []
+        for gram in {query[start:start + NGRAM_SIZE] for start in range(len(query) - NGRAM_SIZE + 1)}:
+            posting = self._postings.get(gram)
+            if not posting:
+                return []
+            postings.append(posting)
+
+        postings.sort(key=len)
+        found = set(postings[0])
+        for posting in postings[1:]:
+            if not found or len(posting) > len(found) * INTERSECT_RATIO:
+                break
+            found.intersection_update(posting)
+        return sorted(found)
+
+    def search_ids(self, query: str, limit: int | None = None) -> list[int]:
+        """
+        Номера товаров, подходящих под запрос, в исходном порядке.
+
+        :param query: Запрос в нижнем регистре.
+        :param limit: Максимальное количество результатов (None — без ограничения).
+        """
+        candidates = self.candidates(query)
+        if candidates is None:
+            candidates = range(len(self.products))
+
+        found = []
+        for product_id in candidates:
+            if self.matches(product_id, query):
+                found.append(product_id)
+                if limit is not None and len(found) >= limit:
+                    break
+        return found
+
+    def search(self, query: str, limit: int | None = None) -> list[dict]:
+        """
+        Товары, у которых артикул или название содержит query.
+
+        :param query: Запрос в нижнем регистре.
+        :param limit: Максимальное количество результатов (None — без ограничения).
+        """
+        return [self.products[product_id] for product_id in self.search_ids(query, limit)]
+
+
+class SearchSession:
+    """
+    Сеанс поиска для диалога: запоминает совпадения предыдущего запроса.
+    Если новый запрос содержит предыдущий (пользователь дописал символы), его совпадения —
+    подмножество прежних, и проверяются только они. При удалении или правке — поиск по индексу.
+    """
+
+    def __init__(self, index: SearchIndex, min_length: int, max_results: int):
+        """
+        :param index: Поисковый индекс товаров.
+        :param min_length: Минимальная длина запроса.
+        :param max_results: Максимальное количество возвращаемых товаров.
+        """
+        self.index = index
+        self.min_length = min_length
+        self.max_results = max_results
+        self._last_query = None
+        self._last_ids = []
+
+    def search(self, search_text: str) -> list[dict]:
+        """
+        Поиск с переиспользованием результатов предыдущего запроса.
+
+        :param search_text: Текст запроса в исходном виде.
+        :return: Первые max_results подходящих товаров.
+        """
+        query = search_text.lower().strip()
+        if len(query) < self.min_length:
+            self.reset()
+            return []
+
+        if self._last_query is not None and self._last_query in query:
+            if query != self._last_query:
+                self._last_ids = [product_id for product_id in self._last_ids
+                                  if self.index.matches(product_id, query)]
+        else:
+            self._last_ids = self.index.search_ids(query)
+        self._last_query = query
+
+        return [self.index.products[product_id] for product_id in self._last_ids[:self.max_results]]
+
+    def reset(self):
+        """Сброс сохранённых результатов."""
+        self._last_query = None
+        self._last_ids = []
@@ -0,0 +1,83 @@
+"""
+Бенчмарк памяти потоковой (write-only) записи листа наличия с уникальным фото в каждой строке.
+Каждое число строк замеряется в отдельном процессе: пик памяти Python (tracemalloc)
+и прирост пикового объёма памяти процесса.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_excel_memory [--rows 200 800 3200] [--pil]
+"""
+
+import argparse
+import io
+import multiprocessing
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from data_engine.data_config import IMAGE_CONFIG
+from data_engine.data_reader import DataReader
+from data_engine.excel_generator import ExcelGenerator
+from benchmarks.bench_thumbnails import image_files, peak_rss_mb
+
+
+def unique_images(count: int, images_dir: str, encoded: bool):
+    """
+    Уникальные миниатюры по одной на строку, создаваемые по мере запроса.
+    Основа — реальное фото из папки, в каждой копии меняется один пиксель.
+
+    :param encoded: Выдавать закодированные байты (как из хранилища миниатюр), а не PIL.Image.
+    """
+    base = DataReader._render_thumbnail(image_files(images_dir)[0])
+    for number in range(count):
+        image = base.copy()
+        image.putpixel((0, 0), (number % 256, number // 256 % 256, 0))
+        if encoded:
+            buffer = io.BytesIO()
+            image.save(buffer, IMAGE_CONFIG['embed_format'])
+            yield buffer.getvalue()
+        else:
+            yield image
+
+
+def run(rows: int, images_dir: str, encoded: bool) -> tuple[float, float, float | None, float]:
+    """
+    Создание одного листа в отдельном процессе.
+
+    :return: (секунды, пик tracemalloc в МБ, прирост пиковой памяти процесса в МБ, размер файла в МБ)
+    """
+    items = [{'article': f'art-{n}', 'name': f'CR-{n}', 'price': 100 + n % 900} for n in range(rows)]
+    with tempfile.TemporaryDirectory() as output_dir:
+        generator = ExcelGenerator(output_dir=output_dir, write_only=True)
+        baseline = peak_rss_mb()
+        tracemalloc.start()
+        started = time.perf_counter()
+        path = generator.generate_general_table({'supplier': 'Бенчмарк', 'items': items,
+                                                 'images': unique_images(rows, images_dir, encoded)})
+        elapsed = time.perf_counter() - started
+        traced_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        peak = peak_rss_mb()
+        size = Path(path).stat().st_size
+    growth = None if baseline is None else peak - baseline
+    return elapsed, traced_peak / 1024 / 1024, growth, size / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[200, 800, 3200], help="Числа строк")
+    parser.add_argument('--images', default='data/images', help="Папка с фото для основы миниатюр")
+    parser.add_argument('--pil', action='store_true',
+                        help="Передавать PIL.Image (кодирует генератор) вместо готовых байтов")
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            elapsed, traced, growth, size = executor.submit(run, rows, args.images, not args.pil).result()
+        growth_text = "н/д" if growth is None else f"{growth:.1f} МБ"
+        print(f"{rows} строк: {elapsed:.2f} с, пик Python {traced:.1f} МБ, "
+              f"прирост пиковой памяти {growth_text}, файл {size:.1f} МБ")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Бенчмарк заполнения листа наличия: отдельные Border/Alignment на каждую ячейку
+(прежний вариант) против одного именованного стиля на ячейку.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_excel_styles [--rows 10000]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+import openpyxl
+from openpyxl.styles import Border, Side, Alignment
+from data_engine.data_config import AVAILABILITY_TABLE_CONFIG
+from data_engine.excel_generator import ExcelGenerator, _register_styles, _save_workbook
+
+
+def per_cell_fill(worksheet, items):
+    """Прежнее заполнение строк наличия: стиль собирается на каждой ячейке (эталон для сравнения)."""
+    border = Border(
+        left=Side(border_style='thick', color='000000'),
+        right=Side(border_style='thick', color='000000'),
+        top=Side(border_style='thick', color='000000'),
+        bottom=Side(border_style='thick', color='000000')
+    )
+    center_align = Alignment(horizontal='center', vertical='center')
+    for row_num, item in enumerate(items, 2):
+        worksheet.row_dimensions[row_num].height = AVAILABILITY_TABLE_CONFIG['row_height']
+        worksheet.cell(row=row_num, column=1).border = border
+
+        cell_b = worksheet.cell(row=row_num, column=2, value=item['name'])
+        cell_b.border = border
+        cell_b.alignment = center_align
+
+        cell_c = worksheet.cell(row=row_num, column=3, value=float(item['price']))
+        cell_c.border = border
+        cell_c.alignment = center_align
+        cell_c.number_format = '#,##0.00'
+
+
+def run(fill, items, filepath: Path, named_styles: bool) -> tuple[float, float]:
+    """
+    Заполнение и сохранение одного листа.
+
+    :return: (мкс на строку при заполнении, секунды на сохранение)
+    """
+    workbook = openpyxl.Workbook()
+    worksheet = workbook.active
+    if named_styles:
+        _register_styles(workbook, AVAILABILITY_TABLE_CONFIG['header_color'])
+
+    started = time.perf_counter()
+    fill(worksheet, items)
+    fill_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    _save_workbook(workbook, str(filepath))
+    save_time = time.perf_counter() - started
+    workbook.close()
+    return fill_time * 1e6 / len(items), save_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000, help="Строк в листе")
+    args = parser.parse_args()
+
+    items = [{'article': f'art-{n}', 'name': f'CR-{n}', 'price': 100 + n % 900} for n in range(args.rows)]
+    with tempfile.TemporaryDirectory() as output_dir:
+        generator = ExcelGenerator(output_dir=output_dir, write_only=False)
+        variants = {
+            'стиль по ячейкам': (per_cell_fill, False),
+            'именованные стили': (generator._fill_general_data, True),
+        }
+        print(f"Строк: {args.rows}")
+        for title, (fill, named_styles) in variants.items():
+            per_row, save_time = run(fill, items, Path(output_dir) / f"{named_styles}.xlsx", named_styles)
+            print(f"{title}: заполнение {per_row:.0f} мкс/строка, сохранение {save_time:.2f} с")
+
+        started = time.perf_counter()
+        generator.generate_general_table({'supplier': 'Бенчмарк', 'items': items})
+        print(f"generate_general_table целиком: {time.perf_counter() - started:.2f} с")
+
+
+if __name__ == '__main__':
+    main()
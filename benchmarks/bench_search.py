@@ -0,0 +1,73 @@
+"""
+Бенчмарк поиска товаров: полный перебор (прежний search_products) против триграммного индекса.
+Показывает время и память построения индекса и время одного запроса.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_search [--rows 60000] [--long-names]
+"""
+
+import argparse
+import logging
+import time
+import tracemalloc
+from backend.backend_config import ORDER_CONFIG
+from backend.search_index import SearchIndex
+from benchmarks.synthetic import synthetic_frame, synthetic_reader
+
+QUERIES = ['cr', 'vl-', 'king', 'trimer', 'mashinka-1', 'vl-boma-fen-12', '4077', 'ма', 'профессион']
+
+
+def linear_search(products: list[dict], query: str) -> list[dict]:
+    """Прежний поиск перебором всех товаров (эталон для сравнения)."""
+    found = []
+    for product in products:
+        if query in product.get('article', '').lower() or query in product.get('name', '').lower():
+            found.append(product)
+    return found[:ORDER_CONFIG['max_search_results']]
+
+
+def per_query(function, repeat: int) -> float:
+    """Среднее время запроса по всем QUERIES, миллисекунды."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for query in QUERIES:
+            function(query)
+    return (time.perf_counter() - started) * 1000 / (repeat * len(QUERIES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=60000, help="Строк в синтетическом каталоге")
+    parser.add_argument('--long-names', action='store_true', help="Длинные наименования товаров")
+    parser.add_argument('--repeat', type=int, default=5, help="Повторов набора запросов")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    products = synthetic_reader(synthetic_frame(args.rows, args.long_names)).get_all_products()
+    limit = ORDER_CONFIG['max_search_results']
+
+    started = time.perf_counter()
+    index = SearchIndex(products)
+    index.build()
+    build_time = time.perf_counter() - started
+
+    # Память — отдельным построением: tracemalloc замедляет выполнение
+    tracemalloc.start()
+    measured = SearchIndex(products)
+    measured.build()
+    build_memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del measured
+
+    for query in QUERIES:
+        if index.search(query, limit) != linear_search(products, query):
+            raise SystemExit(f"Результаты для запроса {query!r} различаются")
+
+    print(f"Товаров: {len(products)}")
+    print(f"Построение индекса: {build_time:.2f} с, {build_memory / 1024 / 1024:.1f} МБ")
+    print(f"Перебор: {per_query(lambda query: linear_search(products, query), args.repeat):.2f} мс/запрос")
+    print(f"Индекс:  {per_query(lambda query: index.search(query, limit), args.repeat):.2f} мс/запрос")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Бенчмарк построения миниатюр по папке изображений: полное декодирование (прежний вариант)
+против декодирования JPEG в уменьшенном разрешении (draft) и reduce перед LANCZOS.
+Показывает время на изображение, размер декодированного буфера и пиковый прирост памяти процесса.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_thumbnails [--images data/images]
+"""
+
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from PIL import Image, ImageChops, ImageStat
+from data_engine.data_config import IMAGE_CONFIG
+from data_engine.data_reader import DataReader
+
+try:
+    import resource
+except ImportError:  # Windows: пиковый объём памяти процесса недоступен
+    resource = None
+
+# Режимы: (draft_decoding, reducing_gap)
+MODES = {
+    'полное декодирование': (False, None),
+    'draft + reduce': (IMAGE_CONFIG['draft_decoding'], IMAGE_CONFIG['reducing_gap']),
+}
+
+
+def image_files(images_dir: str) -> list[Path]:
+    """Изображения поддерживаемых форматов в папке."""
+    extensions = IMAGE_CONFIG['supported_extensions']
+    return sorted(path for path in Path(images_dir).iterdir() if path.suffix.lower() in extensions)
+
+
+def peak_rss_mb() -> float | None:
+    """Пиковый объём памяти процесса, МБ (ru_maxrss в Linux — КБ, в macOS — байты)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if peak > 1 << 32 else peak / 1024
+
+
+def decoded_bytes(path: Path) -> int:
+    """Размер буфера пикселей, который декодер выделит для файла при текущих настройках."""
+    size = (IMAGE_CONFIG['width'], IMAGE_CONFIG['height'])
+    with Image.open(path) as img:
+        if IMAGE_CONFIG['draft_decoding']:
+            img.draft(img.mode, size)
+        return img.size[0] * img.size[1] * len(img.getbands())
+
+
+def run_mode(images_dir: str, draft_decoding: bool, reducing_gap: float | None, repeat: int):
+    """
+    Замер одного режима в отдельном процессе, чтобы пиковая память не смешивалась между режимами.
+
+    :return: (мс на изображение, средний декодированный буфер в МБ, прирост пиковой памяти в МБ, миниатюры)
+    """
+    IMAGE_CONFIG['draft_decoding'] = draft_decoding
+    IMAGE_CONFIG['reducing_gap'] = reducing_gap
+    files = image_files(images_dir)
+    mean_decoded = sum(decoded_bytes(path) for path in files) / len(files)
+
+    baseline = peak_rss_mb()
+    thumbnails = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        thumbnails = [DataReader._render_thumbnail(path) for path in files]
+    elapsed = (time.perf_counter() - started) * 1000 / (repeat * len(files))
+    peak = peak_rss_mb()
+    growth = None if baseline is None else peak - baseline
+    return elapsed, mean_decoded / 1024 / 1024, growth, [image.convert('RGB').tobytes() for image in thumbnails]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--images', default='data/images', help="Папка с изображениями")
+    parser.add_argument('--repeat', type=int, default=3, help="Повторов прохода по папке")
+    args = parser.parse_args()
+
+    files = image_files(args.images)
+    print(f"Изображений: {len(files)} в {args.images}")
+    results = {}
+    for title, (draft_decoding, reducing_gap) in MODES.items():
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            elapsed, decoded, growth, thumbnails = executor.submit(
+                run_mode, args.images, draft_decoding, reducing_gap, args.repeat).result()
+        results[title] = thumbnails
+        growth_text = "н/д" if growth is None else f"{growth:.1f} МБ"
+        print(f"{title}: {elapsed:.1f} мс/изображение, декодированный буфер в среднем {decoded:.2f} МБ, "
+              f"прирост пиковой памяти {growth_text}")
+
+    # Отличие миниатюр нового режима от прежнего (0–255 на канал)
+    size = (IMAGE_CONFIG['width'], IMAGE_CONFIG['height'])
+    before, after = results.values()
+    means, maxima = [], []
+    for old, new in zip(before, after):
+        diff = ImageChops.difference(Image.frombytes('RGB', size, old), Image.frombytes('RGB', size, new))
+        means.append(sum(ImageStat.Stat(diff).mean) / 3)
+        maxima.append(max(ImageStat.Stat(diff).mean))
+    print(f"Отличие от полного декодирования: среднее {sum(means) / len(means):.2f}, "
+          f"худшее изображение {max(maxima):.2f} (из 255)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Синтетический каталог для бенчмарков: DataFrame в формате базы и DataReader поверх него.
+"""
+
+import random
+import pandas as pd
+from data_engine.data_config import REQUIRED_COLUMNS
+from data_engine.data_reader import DataReader
+
+# Пути к примеру базы и фото в репозитории (DataReader проверяет их существование)
+SAMPLE_DATABASE = 'data/table/database.xlsx'
+SAMPLE_IMAGES = 'data/images'
+
+BRANDS = ['cronier', 'king', 'vgr', 'boma', 'proliss', 'sokany', 'geemy', 'mabar', 'makita', 'dewalt']
+KINDS = ['britva', 'mashinka', 'trimer', 'ployka', 'fen', 'epilyator', 'blender', 'otparivatel',
+         'pylesos', 'kofemashina', 'drel', 'perforator', 'benzopila', 'nabor-instrymentov']
+WORDS = ['профессиональный', 'беспроводной', 'аккумуляторный', 'компактный', 'дорожный',
+         'керамический', 'металлический', 'мощный', 'набор', 'насадки', 'черный', 'белый']
+
+
+def synthetic_frame(rows: int, long_names: bool = False, seed: int = 1) -> pd.DataFrame:
+    """
+    Каталог с повторами артикулов у разных поставщиков, пустыми и 'nan' артикулами,
+    пустыми и нечисловыми ценами.
+
+    :param rows: Количество строк.
+    :param long_names: Длинные наименования (несколько слов) вместо коротких кодов продавца.
+    :param seed: Зерно генератора.
+    """
+    rng = random.Random(seed)
+    unique = max(1, rows * 2 // 3)
+    articles, names, prices, suppliers = [], [], [], []
+    for _ in range(rows):
+        number = rng.randrange(unique)
+        brand = BRANDS[number % len(BRANDS)]
+        kind = KINDS[number % len(KINDS)]
+        article = f"vl-{brand}-{kind}-{number}"
+        name = f"{brand[:2].upper()}-{number}"
+        if long_names:
+            name = f"{kind} {brand} {' '.join(rng.sample(WORDS, 3))} {name}"
+
+        roll = rng.random()
+        if roll < 0.005:
+            article = None
+        elif roll < 0.01:
+            article = '  '
+        elif roll < 0.012:
+            article = 'nan'
+        price = rng.randrange(100, 5000)
+        if rng.random() < 0.01:
+            price = None
+        elif rng.random() < 0.002:
+            price = 'договорная'
+
+        articles.append(article)
+        names.append(name if rng.random() > 0.01 else None)
+        prices.append(price)
+        suppliers.append(f"{brand}-{rng.randrange(3)}" if rng.random() > 0.01 else None)
+
+    return pd.DataFrame({
+        REQUIRED_COLUMNS['article']: articles,
+        REQUIRED_COLUMNS['name']: names,
+        REQUIRED_COLUMNS['price']: prices,
+        REQUIRED_COLUMNS['supplier']: suppliers,
+    })
+
+
+def synthetic_reader(frame: pd.DataFrame, images_dir: str = SAMPLE_IMAGES) -> DataReader:
+    """DataReader с уже «загруженным» синтетическим каталогом (без чтения Excel)."""
+    reader = DataReader(SAMPLE_DATABASE, images_dir, snapshot_cache=None)
+    reader.data = frame
+    reader.columns = reader._map_columns()
+    reader.article_index = reader._build_article_index()
+    return reader
@@ -0,0 +1,87 @@
+"""
+Консольный запуск генерации листов наличия и закупки без графического интерфейса.
+
+Без --order создаются листы наличия по всем поставщикам базы,
+с --order — листы закупки по заказу из JSON-файла ({артикул: количество}).
+
+Коды завершения: 0 — все файлы созданы, 1 — ни одного файла не создано,
+2 — файлы созданы, но по части поставщиков или товаров были ошибки.
+
+Примеры:
+    python cli.py --database data/table/database.xlsx --images data/images --output output
+    python cli.py --order order.json
+"""
+
+import argparse
+import logging
+import multiprocessing
+import sys
+from pathlib import Path
+from backend.backend import PurchaseTableBackend
+from backend.backend_config import DEFAULT_PATHS
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_PARTIAL = 2
+
+
+def parse_args(argv=None):
+    """Разбор аргументов командной строки."""
+    parser = argparse.ArgumentParser(description="Генерация листов наличия и закупки без интерфейса")
+    parser.add_argument('--database', default=DEFAULT_PATHS['database_file'], help="Excel-файл базы данных")
+    parser.add_argument('--images', default=DEFAULT_PATHS['images_dir'], help="Папка с изображениями товаров")
+    parser.add_argument('--output', default=DEFAULT_PATHS['output_dir'], help="Папка для созданных файлов")
+    parser.add_argument('--order', help="JSON-файл заказа {артикул: количество}; без него создаются листы наличия")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Подробный журнал")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """
+    Запуск генерации.
+
+    :param argv: Аргументы командной строки (по умолчанию sys.argv).
+    :return: Код завершения.
+    """
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    backend = PurchaseTableBackend()
+    # Пути из аргументов не сохраняются в конфиг, чтобы не менять настройки интерфейса
+    backend.database_file = args.database
+    backend.images_dir = args.images
+    backend.output_dir = args.output
+    backend.open_output_folder = False
+
+    # Ошибки, о которых backend сообщил через колбэк (например, артикулы заказа, которых нет в базе)
+    reported_errors = []
+
+    def report_error(title, message):
+        reported_errors.append(message)
+        print(f"{title}: {message}", file=sys.stderr, flush=True)
+
+    backend.set_callbacks(
+        status_callback=lambda message: print(message, flush=True),
+        message_callback=lambda title, message: print(f"{title}: {message}", flush=True),
+        error_callback=report_error,
+        success_callback=lambda title, message: print(f"{title}: {message}", flush=True)
+    )
+    Path(args.output).mkdir(parents=True, exist_ok=True)
+
+    if args.order:
+        if not backend.load_initial_data() or not backend.load_order_from_json(args.order):
+            return EXIT_FAILED
+        files, errors = backend.generate_purchase_list()
+    else:
+        files, errors = backend.generate_availability_list()
+
+    if not files:
+        return EXIT_FAILED
+    return EXIT_PARTIAL if errors or reported_errors else EXIT_OK
+
+
+if __name__ == "__main__":
+    # Процессы генерации книг в собранном .exe запускаются через этот же файл
+    multiprocessing.freeze_support()
+    sys.exit(main())
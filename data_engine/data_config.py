@@ -18,7 +18,24 @@ IMAGE_CONFIG = {
     'supported_extensions': [               # Поддерживаемые расширения файлов
         '.jpg', '.jpeg', '.png', '.gif', '.bmp'
     ],
-    'background_color': (255, 255, 255)     # Цвет фона при конвертации (RGB)
+    'background_color': (255, 255, 255),    # Цвет фона при конвертации (RGB)
+    'memory_cache_bytes': 64 * 1024 * 1024, # Объём кэша обработанных изображений в памяти (0 — отключить)
+    'thumbnail_format': 'PNG',              # Формат миниатюр в постоянном хранилище на диске
+    'draft_decoding': True,                 # Декодировать JPEG в уменьшенном разрешении (не меньше миниатюры)
+    'reducing_gap': 3.0,                    # Запас для целочисленного уменьшения перед LANCZOS (None — без reduce)
+    'preprocess_workers': None,             # Потоков обработки изображений при генерации (None — по числу ядер)
+    'encoded_cache_bytes': 32 * 1024 * 1024,# Объём закодированных изображений, переиспользуемых за один запуск генерации
+    'embed_format': 'PNG',                  # Формат фото в Excel: 'PNG', 'JPEG' или 'WEBP' (WEBP открывают не все версии Excel)
+    'embed_quality': 85                     # Качество JPEG/WEBP (1–95)
+}
+
+# === Настройки кэша ===
+CACHE_CONFIG = {
+    'enabled': True,                        # Использовать бинарный снимок базы вместо повторного чтения Excel
+    'cache_dir': None,                      # Папка кэша (None — папка кэша пользователя: %LOCALAPPDATA% или ~/.cache)
+    'dir_name': 'purchase_generator_cache', # Имя папки кэша в папке кэша пользователя
+    'snapshot_version': 1,                  # Версия формата снимка (увеличить при изменении структуры)
+    'thumbnails_enabled': True              # Хранить готовые миниатюры товаров на диске между запусками
 }
 
 # === Настройки таблицы закупки (Excel) ===
@@ -51,6 +68,12 @@ AVAILABILITY_TABLE_CONFIG = {
     ]
 }
 
+# === Настройки записи Excel ===
+EXCEL_CONFIG = {
+    'write_only_min_rows': 2000,            # С этого числа позиций книга пишется потоково (0 — всегда, None — никогда)
+    'media_spool_bytes': 8 * 1024 * 1024    # Фото книги сверх этого объёма ждут сохранения во временном файле, а не в памяти
+}
+
 # === Глобальные сообщения об ошибках (можно вынести в отдельный config.py, если хочешь) ===
 ERROR_MESSAGES = {
     'DATABASE_NOT_FOUND': 'Файл базы данных не найден: {}',
@@ -2,37 +2,58 @@
 Класс DataReader — чтение данных из Excel-базы и обработка изображений товаров.
 """
 
+import os
 import pandas as pd
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from PIL import Image
 from decimal import Decimal
 import logging
 
 # Импортируем конфигурацию из data_config.py
-from .data_config import REQUIRED_COLUMNS, IMAGE_CONFIG
+from .data_config import REQUIRED_COLUMNS, IMAGE_CONFIG, CACHE_CONFIG
+from .database_cache import DatabaseCache
+from .image_cache import ImageCache
+from .thumbnail_store import ThumbnailStore
+from .image_index import ImageDirectoryIndex
 from config import FILE_ERRORS, DATA_ERRORS, IMAGE_ERRORS
 
 # Настраиваем логгер
 logger = logging.getLogger(__name__)
 
+# Значение snapshot_cache по умолчанию: кэш по CACHE_CONFIG (None явно отключает кэш)
+_DEFAULT_SNAPSHOT_CACHE = object()
+
 
 class DataReader:
     """
     Класс для чтения и обработки данных о товарах из Excel-файла и изображений.
     """
 
-    def __init__(self, database_path: str, images_dir: str):
+    def __init__(self, database_path: str, images_dir: str,
+                 snapshot_cache: DatabaseCache | None = _DEFAULT_SNAPSHOT_CACHE):
         """
         Инициализация DataReader.
 
         :param database_path: Путь к Excel-файлу с базой данных.
         :param images_dir: Путь к папке с изображениями товаров.
+        :param snapshot_cache: Кэш снимков базы. По умолчанию создаётся, если включён в CACHE_CONFIG;
+                               None — читать базу без снимков.
         :raises FileNotFoundError: Если файл базы или папка с изображениями не существуют.
         """
         self.database_path = Path(database_path)
         self.images_dir = Path(images_dir)
         self.data = None
         self.columns = None
+        self.article_index = {}
+        self.image_index = ImageDirectoryIndex(self.images_dir)
+        self.image_cache = ImageCache(IMAGE_CONFIG['memory_cache_bytes'])
+        self.thumbnail_store = ThumbnailStore(images_dir) if CACHE_CONFIG['thumbnails_enabled'] else None
+        if snapshot_cache is _DEFAULT_SNAPSHOT_CACHE:
+            snapshot_cache = DatabaseCache() if CACHE_CONFIG['enabled'] else None
+        self.snapshot_cache = snapshot_cache
 
         # Проверяем существование файлов и папок
         if not self.database_path.exists():
@@ -43,12 +64,27 @@ class DataReader:
     def load_database(self) -> bool:
         """
         Загружает данные из Excel-файла.
+        Если Excel-файл не менялся, данные читаются из бинарного снимка без разбора openpyxl.
 
         :return: True, если загрузка успешна, иначе False.
         """
         try:
-            self.data = pd.read_excel(self.database_path, engine='openpyxl')
-            self.columns = self._map_columns()
+            fingerprint = None
+            cached_data = None
+            if self.snapshot_cache is not None:
+                fingerprint = self.snapshot_cache.fingerprint(self.database_path)
+                cached_data = self.snapshot_cache.load(fingerprint)
+
+            if cached_data is not None:
+                self.data = cached_data
+                self.columns = self._map_columns()
+            else:
+                self.data = pd.read_excel(self.database_path, engine='openpyxl')
+                self.columns = self._map_columns()
+                if fingerprint is not None:
+                    self.snapshot_cache.save(fingerprint, self.data)
+
+            self.article_index = self._build_article_index()
             logger.info(f"Загружено товаров: {len(self.data)} строк")
             return True
         except Exception as e:
@@ -70,6 +106,42 @@ class DataReader:
                 raise ValueError(DATA_ERRORS['MISSING_REQUIRED_COLUMN'].format(name))
         return columns_map
 
+    @staticmethod
+    def _normalize_article(article) -> str:
+        """Приводит артикул к ключу индекса (строка без пробелов по краям)."""
+        return str(article).strip()
+
+    def _build_article_index(self) -> dict[str, list[dict]]:
+        """
+        Строит индекс {артикул: [записи поставщиков]} за один проход по колонкам.
+        Записи содержат уже готовые Decimal-цены, поэтому поиск по артикулу — O(1).
+
+        :return: Словарь с нормализованными артикулами в качестве ключей.
+        """
+        index = {}
+        articles = self.data[self.columns['article']].tolist()
+        names = self.data[self.columns['name']].tolist()
+        prices = self.data[self.columns['price']].tolist()
+        suppliers = self.data[self.columns['supplier']].tolist()
+
+        for article, name, price, supplier in zip(articles, names, prices, suppliers):
+            if pd.isna(article):
+                continue
+            try:
+                supplier_info = {
+                    'article': str(article),
+                    'name': str(name),
+                    'price': Decimal(str(price)),
+                    'supplier': str(supplier)
+                }
+            except Exception as e:
+                logger.warning(f"Ошибка индексации строки для артикула {article}: {e}")
+                continue
+            index.setdefault(self._normalize_article(article), []).append(supplier_info)
+
+        logger.info(f"Построен индекс по {len(index)} артикулам")
+        return index
+
     def get_product_info(self, article: str) -> list[dict] | None:
         """
         Получает информацию о ВСЕХ записях товара по артикулу (может быть несколько поставщиков).
@@ -78,26 +150,17 @@ class DataReader:
         """
         if self.data is None:
             self.load_database()
-        article_col = self.columns['article']
-        product_rows = self.data[self.data[article_col] == article]
-        if product_rows.empty:
+        records = self.article_index.get(self._normalize_article(article))
+        if not records:
             return None
-
-        suppliers = []
-        for _, row in product_rows.iterrows():
-            supplier_info = {
-                'article': str(row[self.columns['article']]),
-                'name': str(row[self.columns['name']]),
-                'price': Decimal(str(row[self.columns['price']])),
-                'supplier': str(row[self.columns['supplier']])
-            }
-            suppliers.append(supplier_info)
-        return suppliers
+        # Возвращаем копии, чтобы изменения у вызывающего кода не портили индекс
+        return [dict(record) for record in records]
 
     def get_all_products(self) -> list[dict]:
         """
         Получает информацию о всех УНИКАЛЬНЫХ товарах из базы данных.
         Для товаров с несколькими поставщиками, выбирается запись с минимальной ценой.
+        Фильтрация и выбор минимума выполняются по колонкам, Decimal создаётся только для итоговых строк.
         :return: Список словарей с данными товаров (уникальные артикулы).
         """
         if self.data is None:
@@ -105,62 +168,188 @@ class DataReader:
         if self.data is None or self.data.empty:
             return []
 
-        products = {}
-        for _, row in self.data.iterrows():
-            try:
-                article = str(row[self.columns['article']])
-                if pd.isna(row[self.columns['article']]) or article.strip() == '' or article == 'nan':
-                    continue
+        raw_articles = self.data[self.columns['article']]
+        raw_prices = self.data[self.columns['price']]
 
-                product_info = {
-                    'article': article,
-                    'name': str(row[self.columns['name']]) if not pd.isna(row[self.columns['name']]) else '',
-                    'price': Decimal(str(row[self.columns['price']])) if not pd.isna(
-                        row[self.columns['price']]) else Decimal('0'),
-                    'supplier': str(row[self.columns['supplier']]) if not pd.isna(
-                        row[self.columns['supplier']]) else 'Неизвестный поставщик'
-                }
+        # Отбрасываем пустые артикулы и строки 'nan'
+        articles = raw_articles.astype(str)
+        valid = raw_articles.notna() & (articles.str.strip() != '') & (articles != 'nan')
 
-                # Если артикул уже есть, оставляем поставщика с минимальной ценой
-                if article in products:
-                    if product_info['price'] < products[article]['price']:
-                        products[article] = product_info
-                else:
-                    products[article] = product_info
+        # Пустая цена считается нулевой; нечисловую цену пропускаем, как и раньше
+        prices = pd.to_numeric(raw_prices, errors='coerce')
+        invalid_price = prices.isna() & raw_prices.notna()
+        if invalid_price[valid].any():
+            logger.warning(f"Пропущено строк с некорректной ценой: {int(invalid_price[valid].sum())}")
+        valid &= ~invalid_price
 
+        if not valid.any():
+            return []
+
+        # Первая строка с минимальной ценой в каждой группе, группы — в порядке появления
+        candidates = pd.DataFrame({'article': articles[valid], 'price': prices[valid].fillna(0)})
+        best_rows = candidates.groupby('article', sort=False)['price'].idxmin()
+        best = self.data.loc[best_rows.to_numpy()]
+
+        result = []
+        for article, name, price, supplier in zip(
+                best_rows.index,
+                best[self.columns['name']].tolist(),
+                best[self.columns['price']].tolist(),
+                best[self.columns['supplier']].tolist()):
+            try:
+                result.append({
+                    'article': article,
+                    'name': str(name) if not pd.isna(name) else '',
+                    'price': Decimal(str(price)) if not pd.isna(price) else Decimal('0'),
+                    'supplier': str(supplier) if not pd.isna(supplier) else 'Неизвестный поставщик'
+                })
             except Exception as e:
                 logger.warning(f"Ошибка обработки строки в БД: {e}")
                 continue
 
-        result = list(products.values())
         logger.info(f"Получено {len(result)} уникальных товаров из базы данных")
         return result
 
     def process_image(self, article: str) -> Image.Image | None:
         """
         Обрабатывает изображение товара: ищет, ресайзит, конвертирует в RGB.
+        Результат кэшируется в памяти по пути и времени изменения файла
+        и сохраняется в хранилище миниатюр на диске.
 
         :param article: Артикул товара.
         :return: Обработанное изображение (PIL.Image) или None, если не найдено/ошибка.
         """
-        base_name = Path(article).stem
-        for ext in IMAGE_CONFIG['supported_extensions']:
-            test_path = self.images_dir / f"{base_name}{ext}"
-            if test_path.exists():
-                try:
-                    with Image.open(test_path) as img:
-                        # Конвертируем в RGB, если нужно
-                        if img.mode in ('RGBA', 'LA', 'P'):
-                            img = img.convert('RGB')
-                        # Ресайзим
-                        img_resized = img.resize(
-                            (IMAGE_CONFIG['width'], IMAGE_CONFIG['height']),
-                            Image.Resampling.LANCZOS
-                        )
-                        return img_resized.copy()
-                except Exception as e:
-                    logger.error(IMAGE_ERRORS['IMAGE_PROCESSING_ERROR'].format(test_path, e))
-                    return None
-
-        logger.warning(f"Файл изображения не найден для артикула: {article}")
-        return None
\ No newline at end of file
+        image_path = self._find_image_path(article)
+        if image_path is None:
+            logger.warning(f"Файл изображения не найден для артикула: {article}")
+            return None
+
+        try:
+            stat = image_path.stat()
+            cache_key = (str(image_path.resolve()), stat.st_mtime_ns)
+            cached = self.image_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+            img_resized = None
+            if self.thumbnail_store is not None:
+                img_resized = self.thumbnail_store.get_image(image_path, stat)
+            if img_resized is None:
+                img_resized = self._render_thumbnail(image_path)
+                if self.thumbnail_store is not None:
+                    self.thumbnail_store.put_image(image_path, img_resized, stat)
+
+            self.image_cache.put(cache_key, img_resized)
+            return img_resized
+        except Exception as e:
+            logger.error(IMAGE_ERRORS['IMAGE_PROCESSING_ERROR'].format(image_path, e))
+            return None
+
+    def process_image_data(self, article: str) -> bytes | Image.Image | None:
+        """
+        Изображение товара для вставки в Excel. Если вставка идёт в PNG и миниатюра уже есть
+        в хранилище в PNG, возвращаются её байты — без декодирования и повторного кодирования.
+        Иначе — результат process_image(). Байты JPEG/WEBP из хранилища не используются:
+        они закодированы с качеством Pillow по умолчанию, а не IMAGE_CONFIG['embed_quality'].
+
+        :param article: Артикул товара.
+        :return: Закодированные байты, обработанное изображение или None.
+        """
+        store = self.thumbnail_store
+        # PNG без потерь и без настройки качества, поэтому байты хранилища совпадают с кодированием при вставке
+        if store is not None and store.format.upper() == IMAGE_CONFIG['embed_format'].upper() == 'PNG':
+            image_path = self._find_image_path(article)
+            if image_path is not None:
+                data = store.get_bytes(image_path)
+                if data is not None:
+                    return data
+        return self.process_image(article)
+
+    def get_image_mtime(self, article: str) -> int | None:
+        """
+        Время изменения файла изображения товара (версия фото для кэшей UI).
+
+        :param article: Артикул товара.
+        :return: st_mtime_ns или None, если файла нет.
+        """
+        image_path = self._find_image_path(article)
+        if image_path is None:
+            return None
+        try:
+            return image_path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def process_images(self, articles: list[str], workers: int | None = None,
+                       encoded: bool = False) -> Iterator[bytes | Image.Image | None]:
+        """
+        Параллельно обрабатывает изображения для списка артикулов.
+        Pillow отпускает GIL при декодировании и ресайзе, поэтому используется пул потоков,
+        который к тому же разделяет кэши DataReader. Результаты выдаются строго в порядке articles,
+        а одновременно в работе находится не больше двух задач на поток — память ограничена.
+
+        :param articles: Артикулы товаров.
+        :param workers: Количество потоков (по умолчанию IMAGE_CONFIG['preprocess_workers'] или число ядер).
+        :param encoded: Выдавать готовые байты из хранилища миниатюр, где возможно (см. process_image_data).
+        :return: Итератор обработанных изображений (None, если не найдено/ошибка).
+        """
+        process = self.process_image_data if encoded else self.process_image
+        workers = workers or IMAGE_CONFIG['preprocess_workers'] or os.cpu_count() or 1
+        if workers <= 1:
+            for article in articles:
+                yield process(article)
+            return
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image") as executor:
+            pending = deque()
+            for article in articles:
+                pending.append(executor.submit(process, article))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def _find_image_path(self, article: str) -> Path | None:
+        """
+        Ищет файл изображения товара по индексу папки изображений.
+
+        :param article: Артикул товара.
+        :return: Путь к файлу или None, если не найден.
+        """
+        return self.image_index.find(Path(article).stem)
+
+    @staticmethod
+    def _render_thumbnail(image_path: Path) -> Image.Image:
+        """
+        Декодирует исходное изображение и приводит его к размеру миниатюры.
+        JPEG декодируется сразу в уменьшенном разрешении (draft), затем изображение
+        уменьшается целочисленно (reduce) и финально ресайзится LANCZOS.
+
+        :param image_path: Путь к исходному файлу.
+        :return: Миниатюра в RGB.
+        """
+        size = (IMAGE_CONFIG['width'], IMAGE_CONFIG['height'])
+        with Image.open(image_path) as img:
+            if IMAGE_CONFIG['draft_decoding']:
+                # Для JPEG выбирается масштаб 1/2, 1/4 или 1/8, при котором картинка не меньше миниатюры;
+                # для других форматов вызов ничего не делает
+                img.draft(img.mode, size)
+            # Конвертируем в RGB, если нужно
+            if img.mode in ('RGBA', 'LA', 'P'):
+                img = img.convert('RGB')
+            # Ресайзим
+            return img.resize(size, Image.Resampling.LANCZOS, reducing_gap=IMAGE_CONFIG['reducing_gap'])
+
+    def prune_thumbnails(self) -> int:
+        """
+        Удаляет из хранилища миниатюры, исходные файлы которых исчезли или изменились.
+
+        :return: Количество удалённых миниатюр.
+        """
+        if self.thumbnail_store is None:
+            return 0
+        sources = self.image_index.sources()
+        if sources is None:
+            logger.warning("Очистка миниатюр пропущена: папка изображений недоступна")
+            return 0
+        return self.thumbnail_store.prune(sources)
@@ -0,0 +1,142 @@
+"""
+Класс DatabaseCache — бинарный снимок базы товаров, чтобы не разбирать Excel при каждом запуске.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import stat
+from pathlib import Path
+
+import pandas as pd
+
+from .data_config import CACHE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+def cache_root(cache_dir: str | None = None) -> Path:
+    """
+    Корневая папка кэша. По умолчанию — папка кэша текущего пользователя
+    (%LOCALAPPDATA% в Windows, $XDG_CACHE_HOME или ~/.cache в остальных ОС),
+    а не общая временная папка, куда могут писать другие пользователи.
+
+    :param cache_dir: Явно заданная папка (по умолчанию CACHE_CONFIG['cache_dir']).
+    """
+    cache_dir = cache_dir or CACHE_CONFIG['cache_dir']
+    if cache_dir:
+        return Path(cache_dir)
+    base = os.environ.get('LOCALAPPDATA') if os.name == 'nt' else os.environ.get('XDG_CACHE_HOME')
+    return Path(base or Path.home() / '.cache') / CACHE_CONFIG['dir_name']
+
+
+def ensure_private_dir(path: Path) -> Path:
+    """
+    Создаёт папку кэша, доступную только текущему пользователю (0o700).
+    Из кэша загружаются pickle-снимки, поэтому чужая папка не используется:
+    подложенный в неё снимок выполнил бы код при загрузке.
+
+    :param path: Папка кэша.
+    :return: Тот же путь.
+    :raises PermissionError: Если папка принадлежит другому пользователю.
+    """
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if hasattr(os, 'getuid'):
+        info = path.stat()
+        if info.st_uid != os.getuid():
+            raise PermissionError(f"Папка кэша принадлежит другому пользователю: {path}")
+        if stat.S_IMODE(info.st_mode) & 0o077:
+            os.chmod(path, 0o700)
+    return path
+
+
+class DatabaseCache:
+    """
+    Кэш снимков базы данных. Снимок хранится в формате pickle и привязан к пути,
+    размеру, времени изменения и хэшу содержимого Excel-файла.
+    """
+
+    def __init__(self, cache_dir: str | None = None):
+        """
+        Инициализация кэша.
+
+        :param cache_dir: Папка для снимков. По умолчанию берётся из CACHE_CONFIG
+                          или создаётся в папке кэша пользователя (см. cache_root).
+        """
+        self.cache_dir = cache_root(cache_dir)
+
+    def fingerprint(self, database_path: Path) -> dict:
+        """
+        Вычисляет ключ снимка для файла базы данных.
+
+        :param database_path: Путь к Excel-файлу.
+        :return: Словарь с путём, размером, временем изменения и хэшем содержимого.
+        """
+        resolved = Path(database_path).resolve()
+        stat = resolved.stat()
+        digest = hashlib.blake2b(digest_size=20)
+        with open(resolved, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return {
+            'path': str(resolved),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha': digest.hexdigest(),
+            'version': CACHE_CONFIG['snapshot_version'],
+        }
+
+    def load(self, fingerprint: dict) -> pd.DataFrame | None:
+        """
+        Загружает снимок, если он соответствует текущему состоянию файла.
+
+        :param fingerprint: Ключ, полученный из fingerprint().
+        :return: DataFrame из снимка или None при промахе.
+        """
+        snapshot_file, meta_file = self._files(fingerprint['path'])
+        try:
+            if not meta_file.exists() or not snapshot_file.exists():
+                return None
+            ensure_private_dir(self.cache_dir)
+            with open(meta_file, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta != fingerprint:
+                logger.info("Снимок базы устарел, требуется повторное чтение Excel")
+                return None
+            data = pd.read_pickle(snapshot_file)
+            logger.info(f"База загружена из снимка: {snapshot_file}")
+            return data
+        except Exception as e:
+            logger.warning(f"Не удалось прочитать снимок базы: {e}")
+            return None
+
+    def save(self, fingerprint: dict, data: pd.DataFrame) -> bool:
+        """
+        Сохраняет снимок базы. Запись атомарная: сначала во временный файл, затем замена.
+
+        :param fingerprint: Ключ, полученный из fingerprint() до чтения Excel.
+        :param data: Загруженный DataFrame.
+        :return: True, если снимок сохранён.
+        """
+        snapshot_file, meta_file = self._files(fingerprint['path'])
+        try:
+            ensure_private_dir(self.cache_dir)
+            tmp_snapshot = snapshot_file.with_suffix('.pkl.tmp')
+            tmp_meta = meta_file.with_suffix('.json.tmp')
+            data.to_pickle(tmp_snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+            with open(tmp_meta, 'w', encoding='utf-8') as f:
+                json.dump(fingerprint, f, ensure_ascii=False)
+            meta_file.unlink(missing_ok=True)
+            os.replace(tmp_snapshot, snapshot_file)
+            os.replace(tmp_meta, meta_file)
+            return True
+        except Exception as e:
+            logger.warning(f"Не удалось сохранить снимок базы: {e}")
+            return False
+
+    def _files(self, resolved_path: str) -> tuple[Path, Path]:
+        """Пути к файлу снимка и файлу метаданных для заданной базы."""
+        name = hashlib.blake2b(resolved_path.encode('utf-8'), digest_size=10).hexdigest()
+        return self.cache_dir / f"{name}.pkl", self.cache_dir / f"{name}.json"
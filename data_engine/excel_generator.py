@@ -1,35 +1,180 @@
 import openpyxl
-from openpyxl.styles import Border, Side, PatternFill, Font, Alignment
+from openpyxl.styles import Border, Side, PatternFill, Font, Alignment, NamedStyle
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.worksheet.cell_range import CellRange
 from openpyxl.drawing.image import Image as ExcelImage
+from openpyxl.writer.excel import ExcelWriter
+from openpyxl.packaging import manifest
 from pathlib import Path
-from datetime import datetime
-import tempfile
+from datetime import datetime, timezone
+from collections import OrderedDict
+from io import BytesIO
+from zipfile import ZipFile, ZIP_DEFLATED
+from PIL import Image as PILImage
+import hashlib
 import logging
-from .data_config import ERROR_MESSAGES, PURCHASE_TABLE_CONFIG, AVAILABILITY_TABLE_CONFIG
+import os
+import tempfile
+from .data_config import (ERROR_MESSAGES, PURCHASE_TABLE_CONFIG, AVAILABILITY_TABLE_CONFIG, IMAGE_CONFIG,
+                          EXCEL_CONFIG)
 
 logger = logging.getLogger(__name__)
 
+# openpyxl берёт типы содержимого для /xl/media из своего реестра, где WebP отсутствует
+manifest.mimetypes.add_type('image/webp', '.webp')
+
+
+class _EmbeddedImage(ExcelImage):
+    """
+    Изображение для вставки из готовых закодированных байтов. Сами байты лежат в буфере книги
+    (_WorkbookMedia), в объекте остаются только размеры и положение в буфере, поэтому
+    память на строку не зависит от размера фото.
+    Повторное изображение (owner задан) ссылается на часть /xl/media своего владельца.
+    """
+
+    def __init__(self, media: '_WorkbookMedia', data: bytes, owner: '_EmbeddedImage | None' = None):
+        self.ref = None
+        self._media = media
+        self._owner = owner
+        if owner is not None:
+            self.width, self.height, self.format = owner.width, owner.height, owner.format
+            self._offset, self._length = owner._offset, owner._length
+        else:
+            with PILImage.open(BytesIO(data)) as image:
+                self.width, self.height = image.size
+                self.format = image.format.lower()
+            self._offset, self._length = media.store(data)
+
+    def _data(self):
+        return self._media.read(self._offset, self._length)
+
+    @property
+    def path(self):
+        if self._owner is not None:
+            return self._owner.path
+        return super().path
+
+
+class _WorkbookMedia:
+    """
+    Изображения одной книги: владельцы частей /xl/media по хэшу, число вставок и объём.
+    Закодированные байты складываются в буфер, который после EXCEL_CONFIG['media_spool_bytes']
+    переносится во временный файл и читается обратно при сохранении книги.
+    """
+
+    def __init__(self):
+        self.owners = {}    # {хэш: первое вставленное изображение}
+        self.count = 0      # Вставлено изображений (с повторами)
+        self.bytes = 0      # Объём уникальных изображений
+        self._spool = tempfile.SpooledTemporaryFile(max_size=EXCEL_CONFIG['media_spool_bytes'])
+
+    def store(self, data: bytes) -> tuple[int, int]:
+        """Добавить байты в буфер; возвращает (смещение, длина)."""
+        offset = self._spool.seek(0, os.SEEK_END)
+        self._spool.write(data)
+        return offset, len(data)
+
+    def read(self, offset: int, length: int) -> bytes:
+        """Прочитать байты, сохранённые через store()."""
+        self._spool.seek(offset)
+        return self._spool.read(length)
+
+    def close(self):
+        """Удалить буфер (временный файл)."""
+        self._spool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _DedupExcelWriter(ExcelWriter):
+    """ExcelWriter, который записывает каждую часть /xl/media только один раз."""
+
+    def _write_images(self):
+        written = set()
+        for img in self._images:
+            if img.path in written:
+                continue
+            written.add(img.path)
+            self._archive.writestr(img.path[1:], img._data())
+
+
+def _save_workbook(workbook, filepath):
+    """Сохранение книги (аналог openpyxl.Workbook.save) с дедупликацией изображений."""
+    workbook.properties.modified = datetime.now(tz=timezone.utc).replace(tzinfo=None)
+    archive = ZipFile(filepath, 'w', ZIP_DEFLATED, allowZip64=True)
+    _DedupExcelWriter(workbook, archive).save()
+
+
+# Имена стилей, регистрируемых в каждой книге
+STYLE_HEADER = 'pg_header'            # Заголовок таблицы
+STYLE_BORDER = 'pg_border'            # Ячейка только с рамкой (фото, объединённые ячейки)
+STYLE_TEXT = 'pg_text'                # Текст/число по центру
+STYLE_MONEY = 'pg_money'              # Денежная сумма по центру
+STYLE_TOTAL = 'pg_total'              # Итог (жирный)
+STYLE_TOTAL_MONEY = 'pg_total_money'  # Итоговая сумма (жирная)
+
+
+def _register_styles(workbook, header_color: str):
+    """
+    Регистрация именованных стилей в книге. Каждой ячейке затем назначается один стиль,
+    вместо создания и присвоения отдельных Border/Alignment/Font.
+
+    :param header_color: Цвет заливки заголовка (HEX, без #).
+    """
+    side = Side(border_style='thick', color='000000')
+    border = Border(left=side, right=side, top=side, bottom=side)
+    center_align = Alignment(horizontal='center', vertical='center')
+    bold_font = Font(bold=True)
+
+    styles = [
+        NamedStyle(name=STYLE_HEADER, font=Font(bold=True, color='FFFFFF'), border=border,
+                   alignment=center_align,
+                   fill=PatternFill(start_color=header_color, end_color=header_color, fill_type='solid')),
+        NamedStyle(name=STYLE_BORDER, border=border),
+        NamedStyle(name=STYLE_TEXT, border=border, alignment=center_align),
+        NamedStyle(name=STYLE_MONEY, border=border, alignment=center_align, number_format='#,##0.00'),
+        NamedStyle(name=STYLE_TOTAL, font=bold_font, border=border, alignment=center_align),
+        NamedStyle(name=STYLE_TOTAL_MONEY, font=bold_font, border=border, alignment=center_align,
+                   number_format='#,##0.00'),
+    ]
+    for style in styles:
+        workbook.add_named_style(style)
+
 
 class ExcelGenerator:
     """Класс для генерации Excel-файлов с таблицами закупки и наличия."""
 
-    def __init__(self, output_dir: str = "output"):
+    def __init__(self, output_dir: str = "output", write_only: bool | None = None):
         """
         Инициализация генератора.
 
         :param output_dir: Путь к папке для сохранения файлов.
+        :param write_only: Потоковая запись книг (строки сразу уходят в файл, память не растёт
+                           с числом строк). None — по порогу EXCEL_CONFIG['write_only_min_rows'].
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.write_only = write_only
 
-        self.temp_dir = Path(tempfile.gettempdir()) / "purchase_tables"
-        self.temp_dir.mkdir(exist_ok=True)
+        # Закодированные изображения переиспользуются всеми книгами, созданными этим генератором
+        self._encoded_images = OrderedDict()
+        self._encoded_bytes = 0
+
+        # Отчёт по встроенным изображениям: {путь к файлу: {'images', 'unique', 'bytes'}}
+        self.embed_report = {}
 
     def generate_table(self, supplier_data: dict) -> str:
         """
         Генерация таблицы закупки для одного поставщика.
 
-        :param supplier_data: Словарь с ключами 'supplier' (str) и 'items' (list[dict])
+        :param supplier_data: Словарь с ключами 'supplier' (str) и 'items' (list[dict]).
+                              Необязательный ключ 'images' — итератор изображений в порядке items
+                              (вместо 'processed_image' в позициях); изображения берутся по одному
+                              при записи строки и сразу освобождаются.
         :return: Путь к созданному файлу
         :raises Exception: При ошибке генерации
         """
@@ -43,19 +188,16 @@ class ExcelGenerator:
             if filepath.exists():
                 filepath.unlink()
 
-            workbook = openpyxl.Workbook()
-            worksheet = workbook.active
-            worksheet.title = f"Закупка {supplier_name}"
+            workbook, worksheet = self._create_workbook(f"Закупка {supplier_name}", len(items))
+            _register_styles(workbook, PURCHASE_TABLE_CONFIG['header_color'])
 
             self._format_header(worksheet)
-            temp_files = self._fill_data(worksheet, items)
-            self._create_total_row(worksheet, items)
-
-            workbook.save(str(filepath))
+            with _WorkbookMedia() as media:
+                self._fill_data(worksheet, items, media, supplier_data.get('images'))
+                self._create_total_row(worksheet, items)
+                _save_workbook(workbook, str(filepath))
             workbook.close()
-
-            # Очистка временных файлов изображений
-            self._cleanup_temp_files(temp_files)
+            self._report_embedded(filepath, media)
 
             logger.info(f"Excel файл создан: {filepath}")
             return str(filepath)
@@ -69,7 +211,10 @@ class ExcelGenerator:
         """
         Генерация общей таблицы наличия товаров для одного поставщика.
 
-        :param supplier_data: Словарь с ключами 'supplier' (str) и 'items' (list[dict])
+        :param supplier_data: Словарь с ключами 'supplier' (str) и 'items' (list[dict]).
+                              Необязательный ключ 'images' — итератор изображений в порядке items
+                              (вместо 'processed_image' в позициях); изображения берутся по одному
+                              при записи строки и сразу освобождаются.
         :return: Путь к созданному файлу
         :raises Exception: При ошибке генерации
         """
@@ -83,19 +228,16 @@ class ExcelGenerator:
             if filepath.exists():
                 filepath.unlink()
 
-            workbook = openpyxl.Workbook()
-            worksheet = workbook.active
-            worksheet.title = f"Наличие {supplier_name}"
+            workbook, worksheet = self._create_workbook(f"Наличие {supplier_name}", len(items))
+            _register_styles(workbook, AVAILABILITY_TABLE_CONFIG['header_color'])
 
             self._format_general_header(worksheet)
-            temp_files = self._fill_general_data(worksheet, items)
-            self._create_general_total_row(worksheet, items)
-
-            workbook.save(str(filepath))
+            with _WorkbookMedia() as media:
+                self._fill_general_data(worksheet, items, media, supplier_data.get('images'))
+                self._create_general_total_row(worksheet, items)
+                _save_workbook(workbook, str(filepath))
             workbook.close()
-
-            # Очистка временных файлов изображений
-            self._cleanup_temp_files(temp_files)
+            self._report_embedded(filepath, media)
 
             logger.info(f"Общая таблица создана: {filepath}")
             return str(filepath)
@@ -105,220 +247,205 @@ class ExcelGenerator:
             logger.error(error_msg)
             raise Exception(error_msg)
 
+    def _create_workbook(self, title: str, rows_count: int):
+        """
+        Создание книги с одним листом: обычной или потоковой (write-only).
+
+        :param title: Название листа.
+        :param rows_count: Количество позиций (для выбора режима по порогу).
+        :return: (книга, лист)
+        """
+        write_only = self.write_only
+        if write_only is None:
+            threshold = EXCEL_CONFIG['write_only_min_rows']
+            write_only = threshold is not None and rows_count >= threshold
+
+        if write_only:
+            workbook = openpyxl.Workbook(write_only=True)
+            worksheet = workbook.create_sheet(title)
+        else:
+            workbook = openpyxl.Workbook()
+            worksheet = workbook.active
+            worksheet.title = title
+        return workbook, worksheet
+
+    def _write_row(self, worksheet, row_num, cells, height=None):
+        """
+        Запись строки в любом режиме книги. В потоковом режиме строки пишутся строго по порядку
+        и сразу уходят в файл, поэтому высота задаётся до записи и затем удаляется из памяти.
+
+        :param cells: Список (значение, имя стиля) для колонок начиная с A.
+        :param height: Высота строки или None.
+        """
+        if height is not None:
+            worksheet.row_dimensions[row_num].height = height
+
+        if not worksheet.parent.write_only:
+            for col_num, (value, style) in enumerate(cells, 1):
+                worksheet.cell(row=row_num, column=col_num, value=value).style = style
+            return
+
+        row = []
+        for value, style in cells:
+            cell = WriteOnlyCell(worksheet, value)
+            cell.style = style
+            row.append(cell)
+        worksheet.append(row)
+        worksheet.row_dimensions.pop(row_num, None)
+
+    def _merge_cells(self, worksheet, range_string):
+        """Объединение ячеек; в потоковом режиме — до записи строки."""
+        if worksheet.parent.write_only:
+            worksheet.merged_cells.add(CellRange(range_string))
+        else:
+            worksheet.merge_cells(range_string)
+
     def _format_header(self, worksheet):
         """Форматирование заголовка для таблицы закупки."""
         for col_letter, width in PURCHASE_TABLE_CONFIG['column_widths'].items():
             worksheet.column_dimensions[col_letter].width = width
-        header_fill = PatternFill(start_color=PURCHASE_TABLE_CONFIG['header_color'],
-                                  end_color=PURCHASE_TABLE_CONFIG['header_color'], fill_type='solid')
-        header_font = Font(bold=True, color='FFFFFF')
-        border = Border(
-            left=Side(border_style='thick', color='000000'),
-            right=Side(border_style='thick', color='000000'),
-            top=Side(border_style='thick', color='000000'),
-            bottom=Side(border_style='thick', color='000000')
-        )
-        alignment = Alignment(horizontal='center', vertical='center')
-        for col_num, header in enumerate(PURCHASE_TABLE_CONFIG['headers'], 1):
-            cell = worksheet.cell(row=1, column=col_num, value=header)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = alignment
-            cell.border = border
+        self._write_row(worksheet, 1, [(header, STYLE_HEADER) for header in PURCHASE_TABLE_CONFIG['headers']])
 
     def _format_general_header(self, worksheet):
         """Форматирование заголовка для общей таблицы наличия."""
         for col_letter, width in AVAILABILITY_TABLE_CONFIG['column_widths'].items():
             worksheet.column_dimensions[col_letter].width = width
-        header_fill = PatternFill(start_color=AVAILABILITY_TABLE_CONFIG['header_color'],
-                                  end_color=AVAILABILITY_TABLE_CONFIG['header_color'], fill_type='solid')
-        header_font = Font(bold=True, color='FFFFFF')
-        border = Border(
-            left=Side(border_style='thick', color='000000'),
-            right=Side(border_style='thick', color='000000'),
-            top=Side(border_style='thick', color='000000'),
-            bottom=Side(border_style='thick', color='000000')
-        )
-        alignment = Alignment(horizontal='center', vertical='center')
-        for col_num, header in enumerate(AVAILABILITY_TABLE_CONFIG['headers'], 1):
-            cell = worksheet.cell(row=1, column=col_num, value=header)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = alignment
-            cell.border = border
-
-    def _fill_data(self, worksheet, items):
-        """Заполнение данных для таблицы закупки."""
-        border = Border(
-            left=Side(border_style='thick', color='000000'),
-            right=Side(border_style='thick', color='000000'),
-            top=Side(border_style='thick', color='000000'),
-            bottom=Side(border_style='thick', color='000000')
-        )
-        center_align = Alignment(horizontal='center', vertical='center')
-        left_align = Alignment(horizontal='left', vertical='center', wrap_text=True)
-
-        temp_files = []
-        for row_num, item in enumerate(items, 2):
-            worksheet.row_dimensions[row_num].height = PURCHASE_TABLE_CONFIG['row_height']
+        self._write_row(worksheet, 1, [(header, STYLE_HEADER) for header in AVAILABILITY_TABLE_CONFIG['headers']])
+
+    @staticmethod
+    def _row_images(items, images):
+        """Изображения строк: из итератора images или из ключа 'processed_image' позиций."""
+        if images is not None:
+            return images
+        return (item.get('processed_image') for item in items)
 
+    def _fill_data(self, worksheet, items, media, images=None):
+        """Заполнение данных для таблицы закупки."""
+        for row_num, (item, image) in enumerate(zip(items, self._row_images(items, images)), 2):
             # Вставка изображения
-            if item.get('processed_image'):
-                image_file = self._save_temp_image(item['processed_image'], row_num)
-                if image_file:
-                    try:
-                        excel_img = ExcelImage(str(image_file))
-                        excel_img.anchor = f'A{row_num}'
-                        worksheet.add_image(excel_img)
-                        temp_files.append(image_file)
-                    except Exception as e:
-                        logger.warning(f"Ошибка вставки изображения: {e}")
-
-            # Заполнение ячеек
-            worksheet.cell(row=row_num, column=1).border = border
-
-            # Наименование
-            cell_b = worksheet.cell(row=row_num, column=2, value=item['name'])
-            cell_b.border = border
-            cell_b.alignment = center_align
-
-            # Цена
-            cell_c = worksheet.cell(row=row_num, column=3, value=float(item['price']))
-            cell_c.border = border
-            cell_c.alignment = center_align
-            cell_c.number_format = '#,##0.00'
-
-            # Количество
-            cell_d = worksheet.cell(row=row_num, column=4, value=item['quantity'])
-            cell_d.border = border
-            cell_d.alignment = center_align
-
-            # Сумма
-            total_amount = float(item['price']) * item['quantity']
-            cell_e = worksheet.cell(row=row_num, column=5, value=total_amount)
-            cell_e.border = border
-            cell_e.alignment = center_align
-            cell_e.number_format = '#,##0.00'
-
-        return temp_files
-
-    def _fill_general_data(self, worksheet, items):
+            if image is not None:
+                self._add_image(worksheet, image, row_num, media)
+
+            price = float(item['price'])
+            self._write_row(worksheet, row_num, [
+                (None, STYLE_BORDER),                       # Фото
+                (item['name'], STYLE_TEXT),                 # Наименование
+                (price, STYLE_MONEY),                       # Цена
+                (item['quantity'], STYLE_TEXT),             # Количество
+                (price * item['quantity'], STYLE_MONEY),    # Сумма
+            ], PURCHASE_TABLE_CONFIG['row_height'])
+
+    def _fill_general_data(self, worksheet, items, media, images=None):
         """Заполнение данных для общей таблицы наличия."""
-        border = Border(
-            left=Side(border_style='thick', color='000000'),
-            right=Side(border_style='thick', color='000000'),
-            top=Side(border_style='thick', color='000000'),
-            bottom=Side(border_style='thick', color='000000')
-        )
-        center_align = Alignment(horizontal='center', vertical='center')
-        left_align = Alignment(horizontal='left', vertical='center', wrap_text=True)
-
-        temp_files = []
-        for row_num, item in enumerate(items, 2):
-            worksheet.row_dimensions[row_num].height = AVAILABILITY_TABLE_CONFIG['row_height']
-
+        for row_num, (item, image) in enumerate(zip(items, self._row_images(items, images)), 2):
             # Вставка изображения
-            if item.get('processed_image'):
-                image_file = self._save_temp_image(item['processed_image'], row_num)
-                if image_file:
-                    try:
-                        excel_img = ExcelImage(str(image_file))
-                        excel_img.anchor = f'A{row_num}'
-                        worksheet.add_image(excel_img)
-                        temp_files.append(image_file)
-                    except Exception as e:
-                        logger.warning(f"Ошибка вставки изображения: {e}")
-
-            # Заполнение ячеек для общей таблицы
-            worksheet.cell(row=row_num, column=1).border = border
-
-            # Наименование
-            cell_b = worksheet.cell(row=row_num, column=2, value=item['name'])
-            cell_b.border = border
-            cell_b.alignment = center_align
-
-            # Цена
-            cell_c = worksheet.cell(row=row_num, column=3, value=float(item['price']))
-            cell_c.border = border
-            cell_c.alignment = center_align
-            cell_c.number_format = '#,##0.00'
-
-        return temp_files
+            if image is not None:
+                self._add_image(worksheet, image, row_num, media)
+
+            self._write_row(worksheet, row_num, [
+                (None, STYLE_BORDER),                       # Фото
+                (item['name'], STYLE_TEXT),                 # Наименование
+                (float(item['price']), STYLE_MONEY),        # Цена
+            ], AVAILABILITY_TABLE_CONFIG['row_height'])
 
     def _create_total_row(self, worksheet, items):
         """Создание итоговой строки для таблицы закупки."""
         total_row = len(items) + 2
-        worksheet.merge_cells(f'A{total_row}:C{total_row}')
-
-        border = Border(
-            left=Side(border_style='thick', color='000000'),
-            right=Side(border_style='thick', color='000000'),
-            top=Side(border_style='thick', color='000000'),
-            bottom=Side(border_style='thick', color='000000')
-        )
-        center_align = Alignment(horizontal='center', vertical='center')
-        bold_font = Font(bold=True)
-
-        total_cell = worksheet.cell(row=total_row, column=1, value=f"Итого: {len(items)} позиций")
-        total_cell.font = bold_font
-        total_cell.alignment = center_align
-        total_cell.border = border
-
-        for col in [2, 3]:
-            worksheet.cell(row=total_row, column=col).border = border
-
-        quantity_cell = worksheet.cell(row=total_row, column=4, value=sum(item['quantity'] for item in items))
-        quantity_cell.font = bold_font
-        quantity_cell.border = border
-        quantity_cell.alignment = center_align
+        self._merge_cells(worksheet, f'A{total_row}:C{total_row}')
 
+        total_quantity = sum(item['quantity'] for item in items)
         total_amount = sum(float(item['price']) * item['quantity'] for item in items)
-        amount_cell = worksheet.cell(row=total_row, column=5, value=total_amount)
-        amount_cell.font = bold_font
-        amount_cell.border = border
-        amount_cell.alignment = center_align
-        amount_cell.number_format = '#,##0.00'
+        self._write_row(worksheet, total_row, [
+            (f"Итого: {len(items)} позиций", STYLE_TOTAL),
+            (None, STYLE_BORDER),
+            (None, STYLE_BORDER),
+            (total_quantity, STYLE_TOTAL),
+            (total_amount, STYLE_TOTAL_MONEY),
+        ])
 
     def _create_general_total_row(self, worksheet, items):
         """Создание итоговой строки для общей таблицы наличия."""
         total_row = len(items) + 2
-        worksheet.merge_cells(f'A{total_row}:C{total_row}')
-
-        border = Border(
-            left=Side(border_style='thick', color='000000'),
-            right=Side(border_style='thick', color='000000'),
-            top=Side(border_style='thick', color='000000'),
-            bottom=Side(border_style='thick', color='000000')
-        )
-        center_align = Alignment(horizontal='center', vertical='center')
-        bold_font = Font(bold=True)
-
-        total_cell = worksheet.cell(row=total_row, column=1, value=f"Всего позиций: {len(items)}")
-        total_cell.font = bold_font
-        total_cell.alignment = center_align
-        total_cell.border = border
-
-        for col in [2, 3]:
-            worksheet.cell(row=total_row, column=col).border = border
-
-    def _save_temp_image(self, processed_image, row_num):
-        """Сохранение временного изображения для вставки в Excel."""
+        self._merge_cells(worksheet, f'A{total_row}:C{total_row}')
+
+        self._write_row(worksheet, total_row, [
+            (f"Всего позиций: {len(items)}", STYLE_TOTAL),
+            (None, STYLE_BORDER),
+            (None, STYLE_BORDER),
+        ])
+
+    def _add_image(self, worksheet, processed_image, row_num, media):
+        """
+        Вставка изображения в ячейку A{row_num}. Байты уходят в буфер книги (_WorkbookMedia),
+        одинаковые изображения в книге ссылаются на одну часть /xl/media.
+
+        :param media: Изображения текущей книги (_WorkbookMedia).
+        """
         try:
-            temp_file = self.temp_dir / f"temp_{row_num}.png"
-            processed_image.save(str(temp_file), 'PNG')
-            return temp_file
+            digest, data = self._encode_image(processed_image)
+            owner = media.owners.get(digest)
+            excel_img = _EmbeddedImage(media, data, owner)
+            if owner is None:
+                media.owners[digest] = excel_img
+                media.bytes += len(data)
+            excel_img.anchor = f'A{row_num}'
+            worksheet.add_image(excel_img)
+            media.count += 1
         except Exception as e:
-            logger.error(f"Ошибка сохранения временного изображения: {e}")
-            return None
-
-    def _cleanup_temp_files(self, temp_files):
-        """Очистка временных файлов изображений."""
-        for temp_file in temp_files:
-            try:
-                if temp_file.exists():
-                    temp_file.unlink()
-            except Exception as e:
-                logger.warning(f"Не удалось удалить временный файл {temp_file}: {e}")
+            logger.warning(f"Ошибка вставки изображения: {e}")
+
+    def _encode_image(self, processed_image):
+        """
+        Кодирование изображения в формат IMAGE_CONFIG['embed_format'] с переиспользованием
+        результата в пределах запуска. Ключ — хэш пикселей, поэтому одинаковые фото кодируются один раз.
+        Готовые байты (миниатюра из хранилища в формате вставки) используются как есть.
+
+        :param processed_image: PIL.Image или закодированные байты.
+        :return: (хэш, закодированные байты)
+        """
+        if isinstance(processed_image, bytes):
+            return hashlib.blake2b(processed_image, digest_size=16).hexdigest(), processed_image
+
+        embed_format = IMAGE_CONFIG['embed_format'].upper()
+        quality = IMAGE_CONFIG['embed_quality']
+
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(f"{processed_image.mode}|{processed_image.size}|{embed_format}|{quality}".encode())
+        hasher.update(processed_image.tobytes())
+        digest = hasher.hexdigest()
+
+        data = self._encoded_images.get(digest)
+        if data is not None:
+            self._encoded_images.move_to_end(digest)
+            return digest, data
+
+        buffer = BytesIO()
+        if embed_format == 'JPEG':
+            image = processed_image if processed_image.mode in ('RGB', 'L') else processed_image.convert('RGB')
+            image.save(buffer, 'JPEG', quality=quality, optimize=True)
+        elif embed_format == 'WEBP':
+            processed_image.save(buffer, 'WEBP', quality=quality, method=6)
+        else:
+            processed_image.save(buffer, 'PNG')
+        data = buffer.getvalue()
+
+        self._encoded_images[digest] = data
+        self._encoded_bytes += len(data)
+        while self._encoded_bytes > IMAGE_CONFIG['encoded_cache_bytes'] and len(self._encoded_images) > 1:
+            _, evicted = self._encoded_images.popitem(last=False)
+            self._encoded_bytes -= len(evicted)
+        return digest, data
+
+    def _report_embedded(self, filepath, media):
+        """Запись в отчёт объёма изображений, встроенных в книгу."""
+        self.embed_report[str(filepath)] = {
+            'images': media.count,
+            'unique': len(media.owners),
+            'bytes': media.bytes,
+        }
+        logger.info(f"Изображений в {filepath.name}: {media.count} "
+                    f"(уникальных {len(media.owners)}), {media.bytes / 1024:.1f} КБ "
+                    f"в формате {IMAGE_CONFIG['embed_format']}")
 
     def _format_date(self):
         """Форматирование даты в формат 'DD Месяца YY'."""
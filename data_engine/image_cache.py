@@ -0,0 +1,91 @@
+"""
+Кэш обработанных изображений товаров в памяти с вытеснением по LRU.
+"""
+
+import threading
+import logging
+from collections import OrderedDict
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+
+class ImageCache:
+    """
+    LRU-кэш обработанных миниатюр с ограничением по объёму в байтах.
+    Ключ — (путь к исходному файлу, время изменения), поэтому изменённый файл обрабатывается заново.
+    Потокобезопасен: используется и UI, и фоновыми потоками генерации.
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        :param max_bytes: Максимальный суммарный объём пикселей в кэше (0 — кэш отключён).
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Image.Image | None:
+        """
+        Получить изображение из кэша. Возвращается копия, чтобы вызывающий код мог её изменять.
+
+        :param key: Ключ (путь, время изменения).
+        :return: Копия изображения или None при промахе.
+        """
+        with self._lock:
+            image = self._items.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+        return image.copy()
+
+    def put(self, key: tuple, image: Image.Image):
+        """
+        Сохранить изображение в кэше, вытесняя давно не использованные записи.
+
+        :param key: Ключ (путь, время изменения).
+        :param image: Обработанное изображение (сохраняется копия).
+        """
+        size = self._image_bytes(image)
+        if size > self.max_bytes:
+            return
+        image = image.copy()
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= self._image_bytes(previous)
+            self._items[key] = image
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.current_bytes -= self._image_bytes(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        """Очистить кэш (счётчики сохраняются)."""
+        with self._lock:
+            self._items.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        """Статистика кэша: попадания, промахи, вытеснения, записи и занятый объём."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'items': len(self._items),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+    @staticmethod
+    def _image_bytes(image: Image.Image) -> int:
+        """Объём пикселей изображения в байтах."""
+        return image.width * image.height * len(image.getbands())
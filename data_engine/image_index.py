@@ -0,0 +1,97 @@
+"""
+Класс ImageDirectoryIndex — индекс папки изображений {имя файла без расширения: путь}.
+"""
+
+import os
+import threading
+import logging
+from pathlib import Path
+
+from .data_config import IMAGE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class ImageDirectoryIndex:
+    """
+    Строится одним проходом os.scandir по папке изображений и перестраивается
+    только при изменении времени модификации папки (добавление, удаление, переименование файлов).
+    При нескольких файлах с одним именем выбирается расширение, стоящее раньше
+    в IMAGE_CONFIG['supported_extensions'].
+    """
+
+    def __init__(self, images_dir: Path):
+        """
+        :param images_dir: Папка с изображениями товаров.
+        """
+        self.images_dir = Path(images_dir)
+        self._paths = {}
+        self._dir_mtime_ns = None
+        self._scan_failed = False
+        self._lock = threading.Lock()
+        self._priority = {os.path.normcase(ext): rank
+                          for rank, ext in enumerate(IMAGE_CONFIG['supported_extensions'])}
+
+    def find(self, base_name: str) -> Path | None:
+        """
+        Найти файл изображения по имени без расширения.
+
+        :param base_name: Имя файла (обычно артикул).
+        :return: Путь к файлу или None, если не найден.
+        """
+        self._refresh_if_changed()
+        return self._paths.get(os.path.normcase(base_name))
+
+    def sources(self) -> list[Path] | None:
+        """
+        Все найденные изображения (по одному на имя).
+
+        :return: Список путей или None, если папку прочитать не удалось (пустой список тут
+                 означал бы, что изображений нет, и хранилище миниатюр очистилось бы целиком).
+        """
+        self._refresh_if_changed()
+        if self._scan_failed:
+            return None
+        return list(self._paths.values())
+
+    def _refresh_if_changed(self):
+        """Перестроить индекс, если папка изменилась с момента последнего сканирования."""
+        try:
+            dir_mtime_ns = os.stat(self.images_dir).st_mtime_ns
+        except OSError:
+            dir_mtime_ns = None
+        if dir_mtime_ns is not None and dir_mtime_ns == self._dir_mtime_ns:
+            return
+
+        with self._lock:
+            if dir_mtime_ns is not None and dir_mtime_ns == self._dir_mtime_ns:
+                return
+            paths = self._scan()
+            self._scan_failed = paths is None
+            self._paths = paths or {}
+            # После ошибки папка сканируется заново при следующем обращении
+            self._dir_mtime_ns = None if paths is None else dir_mtime_ns
+
+    def _scan(self) -> dict[str, Path] | None:
+        """
+        Один проход по папке: {нормализованное имя: путь с наиболее приоритетным расширением}.
+
+        :return: Словарь путей или None, если папку прочитать не удалось.
+        """
+        best = {}
+        try:
+            with os.scandir(self.images_dir) as entries:
+                for entry in entries:
+                    stem, ext = os.path.splitext(entry.name)
+                    rank = self._priority.get(os.path.normcase(ext))
+                    if rank is None or not entry.is_file():
+                        continue
+                    key = os.path.normcase(stem)
+                    if key not in best or rank < best[key][0]:
+                        best[key] = (rank, Path(entry.path))
+        except OSError as e:
+            logger.warning(f"Не удалось прочитать папку изображений {self.images_dir}: {e}")
+            return None
+
+        logger.info(f"Проиндексировано изображений: {len(best)}")
+        return {key: path for key, (_, path) in best.items()}
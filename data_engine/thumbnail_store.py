@@ -0,0 +1,152 @@
+"""
+Класс ThumbnailStore — постоянное хранилище готовых миниатюр товаров на диске.
+"""
+
+import hashlib
+import io
+import logging
+import os
+import threading
+from pathlib import Path
+from PIL import Image
+
+from .data_config import IMAGE_CONFIG
+from .database_cache import cache_root, ensure_private_dir
+
+logger = logging.getLogger(__name__)
+
+
+class ThumbnailStore:
+    """
+    Хранит закодированные миниатюры (байты, готовые для вставки в Excel и UI).
+    Ключ записи — путь, размер и время изменения исходного файла, а также размеры из IMAGE_CONFIG,
+    поэтому изменённые фотографии и смена размеров приводят к новой записи.
+    Для каждой папки изображений используется отдельная подпапка, что позволяет удалять
+    записи, исходные файлы которых исчезли.
+    """
+
+    def __init__(self, images_dir: str, cache_dir: str | None = None):
+        """
+        :param images_dir: Папка с исходными изображениями.
+        :param cache_dir: Корневая папка кэша. По умолчанию берётся из CACHE_CONFIG
+                          или создаётся в папке кэша пользователя (см. cache_root).
+        """
+        self.root = cache_root(cache_dir)
+        self._root_checked = False
+        images_key = hashlib.blake2b(str(Path(images_dir).resolve()).encode('utf-8'), digest_size=8).hexdigest()
+        self.store_dir = self.root / 'thumbnails' / images_key
+        self.format = IMAGE_CONFIG['thumbnail_format']
+
+    def _check_root(self):
+        """Проверить (один раз) что корень кэша принадлежит текущему пользователю."""
+        if not self._root_checked:
+            ensure_private_dir(self.root)
+            self._root_checked = True
+
+    def entry_path(self, source: Path, stat: os.stat_result | None = None) -> Path:
+        """
+        Путь к записи для исходного файла в его текущем состоянии.
+
+        :param source: Путь к исходному изображению.
+        :param stat: Результат stat() исходного файла, если уже известен.
+        """
+        stat = stat or source.stat()
+        key = (f"{source.resolve()}|{stat.st_size}|{stat.st_mtime_ns}|"
+               f"{IMAGE_CONFIG['width']}x{IMAGE_CONFIG['height']}|{self.format}")
+        name = hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+        return self.store_dir / f"{source.stem}.{name}.{self.format.lower()}"
+
+    def get_bytes(self, source: Path, stat: os.stat_result | None = None) -> bytes | None:
+        """
+        Прочитать готовую миниатюру.
+
+        :return: Закодированные байты или None, если записи нет.
+        """
+        try:
+            self._check_root()
+            return self.entry_path(source, stat).read_bytes()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Не удалось прочитать миниатюру для {source}: {e}")
+            return None
+
+    def get_image(self, source: Path, stat: os.stat_result | None = None) -> Image.Image | None:
+        """
+        Прочитать миниатюру как PIL.Image.
+
+        :return: Загруженное изображение или None, если записи нет.
+        """
+        data = self.get_bytes(source, stat)
+        if data is None:
+            return None
+        try:
+            with Image.open(io.BytesIO(data)) as img:
+                img.load()
+                return img.convert('RGB') if img.mode != 'RGB' else img.copy()
+        except Exception as e:
+            logger.warning(f"Повреждённая миниатюра для {source}: {e}")
+            return None
+
+    def put_image(self, source: Path, image: Image.Image, stat: os.stat_result | None = None) -> bytes | None:
+        """
+        Закодировать и сохранить миниатюру. Запись атомарная.
+
+        :return: Сохранённые байты или None при ошибке.
+        """
+        try:
+            buffer = io.BytesIO()
+            image.save(buffer, format=self.format)
+            data = buffer.getvalue()
+
+            entry = self.entry_path(source, stat)
+            self._check_root()
+            self.store_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+            tmp_entry = entry.with_name(f"{entry.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_entry.write_bytes(data)
+            os.replace(tmp_entry, entry)
+            return data
+        except Exception as e:
+            logger.warning(f"Не удалось сохранить миниатюру для {source}: {e}")
+            return None
+
+    def prune(self, live_sources: list[Path]) -> int:
+        """
+        Удалить записи, для которых нет актуального исходного файла
+        (файл удалён, изменён или изменились размеры миниатюр).
+
+        :param live_sources: Существующие исходные изображения в папке.
+        :return: Количество удалённых записей.
+        """
+        if not self.store_dir.exists():
+            return 0
+        try:
+            self._check_root()
+        except OSError as e:
+            logger.warning(f"Хранилище миниатюр не используется: {e}")
+            return 0
+
+        live_entries = set()
+        for source in live_sources:
+            try:
+                live_entries.add(self.entry_path(source).name)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                # Папка изображений стала недоступна: без списка живых записей удалять нечего
+                logger.warning(f"Очистка миниатюр прервана: {e}")
+                return 0
+
+        removed = 0
+        for entry in self.store_dir.iterdir():
+            if entry.name in live_entries:
+                continue
+            try:
+                entry.unlink()
+                removed += 1
+            except OSError as e:
+                logger.warning(f"Не удалось удалить устаревшую миниатюру {entry}: {e}")
+
+        if removed:
+            logger.info(f"Удалено устаревших миниатюр: {removed}")
+        return removed
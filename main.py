@@ -8,6 +8,7 @@ from tkinter import ttk
 from pathlib import Path
 import threading
 import time
+import multiprocessing
 
 # ВЕРСИЯ ПРИЛОЖЕНИЯ - автоматически обновляется скриптом релиза
 CURRENT_VERSION = "1.0.14"
@@ -296,4 +297,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Процессы генерации книг в собранном .exe запускаются через этот же файл
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
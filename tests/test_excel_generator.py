@@ -0,0 +1,68 @@
+"""
+Регрессионные тесты ExcelGenerator, зависящие от внутренних деталей openpyxl
+(дедупликация частей /xl/media через собственный ExcelWriter).
+
+Запуск из корня проекта:
+    python -m unittest discover -s tests -t .
+"""
+
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+import openpyxl
+from PIL import Image
+from data_engine.excel_generator import ExcelGenerator
+
+COLORS = [(200, 30, 30), (30, 200, 30), (30, 30, 200)]
+
+
+class DedupImagesTest(unittest.TestCase):
+    """Повторяющиеся фото: книга открывается, а каждое уникальное фото хранится один раз."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self._tmp.name)
+        images = [Image.new('RGB', (215, 200), color) for color in COLORS]
+        # Семь строк с тремя уникальными фото и одна строка без фото
+        self.row_images = [images[0], images[1], images[0], images[2], None, images[1], images[0], images[2]]
+        self.items = [{'article': f'art-{n}', 'name': f'Товар {n}', 'price': 100 + n, 'quantity': n + 1}
+                      for n in range(len(self.row_images))]
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def check_workbook(self, path: str, generator: ExcelGenerator):
+        expected = sum(image is not None for image in self.row_images)
+        with zipfile.ZipFile(path) as archive:
+            media = [name for name in archive.namelist() if name.startswith('xl/media/')]
+        self.assertEqual(len(media), len(COLORS))
+
+        workbook = openpyxl.load_workbook(path)
+        worksheet = workbook.active
+        self.assertEqual(len(worksheet._images), expected)
+        self.assertEqual(worksheet.max_row, len(self.items) + 2)
+        workbook.close()
+
+        report = generator.embed_report[path]
+        self.assertEqual((report['images'], report['unique']), (expected, len(COLORS)))
+
+    def test_general_table(self):
+        for write_only in (False, True):
+            with self.subTest(write_only=write_only):
+                generator = ExcelGenerator(output_dir=str(self.output_dir / str(write_only)), write_only=write_only)
+                path = generator.generate_general_table({'supplier': 'Тест', 'items': self.items,
+                                                         'images': iter(self.row_images)})
+                self.check_workbook(path, generator)
+
+    def test_purchase_table(self):
+        for write_only in (False, True):
+            with self.subTest(write_only=write_only):
+                generator = ExcelGenerator(output_dir=str(self.output_dir / str(write_only)), write_only=write_only)
+                items = [dict(item, processed_image=image) for item, image in zip(self.items, self.row_images)]
+                path = generator.generate_table({'supplier': 'Тест', 'items': items})
+                self.check_workbook(path, generator)
+
+
+if __name__ == '__main__':
+    unittest.main()
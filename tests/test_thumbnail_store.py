@@ -0,0 +1,58 @@
+"""
+Регрессионные тесты очистки хранилища миниатюр.
+
+Запуск из корня проекта:
+    python -m unittest discover -s tests -t .
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+from PIL import Image
+from data_engine.data_reader import DataReader
+from data_engine.thumbnail_store import ThumbnailStore
+
+
+class PruneThumbnailsTest(unittest.TestCase):
+    """Очистка удаляет только записи исчезнувших файлов и не срабатывает, если папку не прочитать."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        root = Path(self._tmp.name)
+        self.images_dir = root / 'images'
+        self.images_dir.mkdir()
+        database = root / 'database.xlsx'
+        database.touch()
+
+        self.reader = DataReader(str(database), str(self.images_dir), snapshot_cache=None)
+        self.reader.thumbnail_store = ThumbnailStore(str(self.images_dir), cache_dir=str(root / 'cache'))
+        self.sources = []
+        for n in range(3):
+            source = self.images_dir / f'art-{n}.png'
+            Image.new('RGB', (40, 40), (n * 80, 0, 0)).save(source)
+            self.reader.thumbnail_store.put_image(source, Image.new('RGB', (20, 20)))
+            self.sources.append(source)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def stored(self) -> int:
+        return len(list(self.reader.thumbnail_store.store_dir.iterdir()))
+
+    def test_removed_source(self):
+        self.sources[0].unlink()
+        self.assertEqual(self.reader.prune_thumbnails(), 1)
+        self.assertEqual(self.stored(), 2)
+
+    def test_unreadable_images_dir(self):
+        with mock.patch('data_engine.image_index.os.scandir', side_effect=OSError("share unavailable")):
+            self.assertIsNone(self.reader.image_index.sources())
+            self.assertEqual(self.reader.prune_thumbnails(), 0)
+        self.assertEqual(self.stored(), 3)
+        # После восстановления папка сканируется заново
+        self.assertEqual(len(self.reader.image_index.sources()), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
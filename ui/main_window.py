@@ -3,14 +3,21 @@ UI модуль для генератора таблиц закупки.
 Содержит весь пользовательский интерфейс на customtkinter.
 """
 import os
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog
 import customtkinter as ctk
+from PIL import Image
 from backend.backend import PurchaseTableBackend
-from utils.image_utils import create_rounded_image, pil_to_photoimage
+from utils.image_utils import create_rounded_image, pil_to_photoimage, PhotoImageCache
 from . import ui_config
 import json
-from .ui_config import CONFIG_FILE
+from concurrent.futures import ThreadPoolExecutor
+from .ui_config import CONFIG_FILE, SEARCH_CONFIG, TREE_PHOTO_CONFIG
+from .virtual_list import VirtualListbox
+
+# Версия фото строки, которое ещё не загружалось (None — товар без фото)
+_NOT_LOADED = object()
 
 
 class SearchDialog:
@@ -21,8 +28,18 @@ class SearchDialog:
         self.backend = backend
         self.update_tree_callback = update_tree_callback
         self.update_status_callback = update_status_callback
-        self.filtered_items = {}
+        self.found_items = []
         self.added_count = 0  # Счетчик добавленных товаров
+        self.search_session = backend.create_search_session()
+
+        # Поиск выполняется в одном фоновом потоке; устаревшие результаты отбрасываются
+        self.search_executor = ThreadPoolExecutor(max_workers=1)
+        # Индекс строится вне очереди поиска, пока пользователь печатает: список всех товаров
+        # и короткие запросы его не ждут
+        threading.Thread(target=self.search_session.index.build, daemon=True).start()
+        self.search_generation = 0
+        self.search_future = None
+        self.debounce_id = None
 
         self.dialog = ctk.CTkToplevel(parent)
         self.dialog.title("Поиск товара")
@@ -83,8 +100,10 @@ class SearchDialog:
             listbox_fg = "#000000"
             listbox_highlight_bg = "#D0D0D0"
 
-        self.found_listbox = tk.Listbox(
+        # Виртуальный список: в Listbox только видимые строки, остальные — при прокрутке
+        self.found_listbox = VirtualListbox(
             list_frame,
+            format_item=self.format_product,
             height=12,
             font=("Arial", 11),
             bg=listbox_bg,
@@ -97,10 +116,6 @@ class SearchDialog:
             highlightbackground=listbox_highlight_bg,
             highlightcolor="#2196F3"
         )
-        found_scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.found_listbox.yview)
-        self.found_listbox.config(yscrollcommand=found_scrollbar.set)
-        self.found_listbox.pack(side=tk.LEFT, fill="both", expand=True)
-        found_scrollbar.pack(side=tk.RIGHT, fill="y")
 
         # Привязываем двойной клик
         self.found_listbox.bind("<Double-Button-1>", self.on_double_click)
@@ -144,28 +159,71 @@ class SearchDialog:
 
         # Привязка Escape к отмене
         self.dialog.bind('<Escape>', lambda e: self.cancel())
+        self.dialog.protocol("WM_DELETE_WINDOW", self.cancel)
 
         # Загружаем все товары при открытии
         self.on_search_change()
 
     def on_search_change(self, *args):
-        """Обработка изменения поиска"""
+        """Обработка изменения поиска: откладываем запуск до паузы в наборе"""
+        self.search_generation += 1
+        if self.debounce_id is not None:
+            self.dialog.after_cancel(self.debounce_id)
+        self.debounce_id = self.dialog.after(SEARCH_CONFIG['debounce_ms'], self.start_search)
+
+    def start_search(self):
+        """Запуск поиска в фоновом потоке"""
+        self.debounce_id = None
+        if self.search_future is not None:
+            self.search_future.cancel()
+
+        generation = self.search_generation
         search_text = self.search_var.get().strip()
-
         if not search_text:
-            found_products = self.backend.get_all_products()
-        else:
-            found_products = self.backend.search_products(search_text)
+            # Все товары — представление без копирования, показывается сразу в потоке Tk
+            self.search_future = None
+            self.show_results(self.backend.get_products_view())
+            return
+        self.search_future = self.search_executor.submit(self.run_search, search_text)
+        self.dialog.after(SEARCH_CONFIG['poll_ms'], self.check_search, self.search_future, generation)
 
-        self.found_listbox.delete(0, tk.END)
-        self.filtered_items.clear()
+    def run_search(self, search_text):
+        """Поиск товаров (выполняется в фоновом потоке)"""
+        return self.search_session.search(search_text)
 
-        for i, product in enumerate(found_products):
-            article = product.get('article', '???')
-            name = product.get('name', 'Без названия')[:40]
-            display_text = f"{article} - {name}..."
-            self.found_listbox.insert(tk.END, display_text)
-            self.filtered_items[i] = product
+    def check_search(self, future, generation):
+        """Проверка готовности результата; устаревшие результаты не отображаются"""
+        if generation != self.search_generation or future.cancelled():
+            return
+        if not future.done():
+            self.dialog.after(SEARCH_CONFIG['poll_ms'], self.check_search, future, generation)
+            return
+        try:
+            found_products = future.result()
+        except Exception as e:
+            print(f"Ошибка поиска: {e}")
+            return
+        self.show_results(found_products)
+
+    def show_results(self, found_products):
+        """Отображение найденных товаров в списке"""
+        self.found_items = found_products
+        self.found_listbox.set_items(found_products)
+
+    @staticmethod
+    def format_product(product):
+        """Строка товара для списка"""
+        article = product.get('article', '???')
+        name = product.get('name', 'Без названия')[:40]
+        return f"{article} - {name}..."
+
+    def stop_search(self):
+        """Остановка фонового поиска при закрытии окна"""
+        self.search_generation += 1
+        if self.debounce_id is not None:
+            self.dialog.after_cancel(self.debounce_id)
+            self.debounce_id = None
+        self.search_executor.shutdown(wait=False, cancel_futures=True)
 
     def on_double_click(self, event):
         """Обработчик двойного клика - добавляет товар"""
@@ -179,10 +237,10 @@ class SearchDialog:
             return
 
         index = selection[0]
-        if index not in self.filtered_items:
+        if index >= len(self.found_items):
             return
 
-        product = self.filtered_items[index]
+        product = self.found_items[index]
 
         # Временно отключаем колбэк success, чтобы не показывать окно при каждом добавлении
         original_success_callback = self.backend.success_callback
@@ -206,11 +264,13 @@ class SearchDialog:
             # Показываем итоговое сообщение как при загрузке из JSON
             messagebox.showinfo("Успех", f"Успешно добавлено товаров: {self.added_count}", parent=self.dialog)
         self.result = True
+        self.stop_search()
         self.dialog.destroy()
 
     def cancel(self):
         """Закрыть окно без результата"""
         self.result = None
+        self.stop_search()
         self.dialog.destroy()
 
 
@@ -458,6 +518,8 @@ class PurchaseTableGUI:
         # Загрузка данных при старте
         self.backend.load_initial_data()
 
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
     def load_config(self):
         """Загрузка сохранённых путей из config.json"""
         if os.path.exists(CONFIG_FILE):
@@ -519,7 +581,7 @@ class PurchaseTableGUI:
                                 background="#2A2A2A",
                                 foreground="white",
                                 fieldbackground="#2A2A2A",
-                                rowheight=190,
+                                rowheight=TREE_PHOTO_CONFIG['row_height'],
                                 font=("Arial", 11))
                 style.configure("Custom.Treeview.Heading",
                                 background="#3A3A3A",
@@ -533,7 +595,7 @@ class PurchaseTableGUI:
                                 background="white",
                                 foreground="black",
                                 fieldbackground="white",
-                                rowheight=190,  # ИСПРАВЛЕНИЕ: было 28, теперь 190
+                                rowheight=TREE_PHOTO_CONFIG['row_height'],  # ИСПРАВЛЕНИЕ: было 28, теперь 190
                                 font=("Arial", 11))
                 style.configure("Custom.Treeview.Heading",
                                 background="#E0E0E0",
@@ -876,20 +938,37 @@ class PurchaseTableGUI:
 
         # === Устанавливаем высоту строки = 190px ===
         style = ttk.Style()
-        style.configure("Custom.Treeview", rowheight=190)
+        style.configure("Custom.Treeview", rowheight=TREE_PHOTO_CONFIG['row_height'])
 
         # Scrollbar
-        tree_scrollbar = ttk.Scrollbar(tree_inner_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.config(yscrollcommand=tree_scrollbar.set)
+        self.tree_scrollbar = ttk.Scrollbar(tree_inner_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.config(yscrollcommand=self.on_tree_scroll)
         self.tree.pack(side=tk.LEFT, fill="both", expand=True)
-        tree_scrollbar.pack(side=tk.RIGHT, fill="y")
+        self.tree_scrollbar.pack(side=tk.RIGHT, fill="y")
 
         # Биндинги
         self.tree.bind("<Double-1>", self.on_tree_double_click)
         self.tree.bind("<Button-1>", self.on_tree_single_click)
+        self.tree.bind("<Configure>", lambda e: self.schedule_visible_photos())
 
-        # Хранилище изображений (чтобы GC не удалил)
+        # Загруженные фото строк (чтобы GC не удалил): {артикул: (версия файла фото, PhotoImage или None)}
         self.tree_images = {}
+        # Последняя известная версия файла фото по артикулу (определяется в фоновом потоке)
+        self.photo_versions = {}
+        # Готовые скруглённые фото, переживают перестроение строк и повторное добавление товара
+        self.photo_cache = PhotoImageCache(TREE_PHOTO_CONFIG['cache_items'])
+
+        # Фото видимых строк загружаются в одном фоновом потоке, до готовности показывается заглушка
+        self.photo_executor = ThreadPoolExecutor(max_workers=1)
+        self.photo_futures = {}  # {артикул: future}
+        self.photo_poll_id = None
+        self.visible_photos_id = None
+        size = TREE_PHOTO_CONFIG['size']
+        self.photo_placeholder = pil_to_photoimage(create_rounded_image(
+            Image.new("RGB", size, TREE_PHOTO_CONFIG['placeholder_color']), size,
+            TREE_PHOTO_CONFIG['corner_radius']))
+        # Отображаемые значения строк {артикул: values} — строки дерева имеют iid = артикул
+        self.tree_rows = {}
 
     def create_control_buttons(self):
         """Создание кнопок управления"""
@@ -964,7 +1043,7 @@ class PurchaseTableGUI:
         if not values or len(values) < 5:
             return
 
-        article = values[1]  # Артикул в позиции 1
+        article = item  # iid строки — артикул (значения колонок Tk может привести к числу)
         try:
             current_qty = int(values[4])  # Количество в позиции 4
         except (ValueError, IndexError):
@@ -984,50 +1063,169 @@ class PurchaseTableGUI:
                 self.update_tree()
 
     def update_tree(self):
-        """Обновление дерева товаров с правильным размещением изображений"""
-        from utils.image_utils import create_rounded_image, pil_to_photoimage
-
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        self.tree_images.clear()
-
+        """
+        Синхронизация дерева с заказом. Строки имеют iid = артикул: новые вставляются,
+        у изменившихся обновляются только значения, удалённые убираются.
+        Новые строки показываются сразу с заглушкой (или фото из кэша);
+        фото видимых строк догружаются в фоне.
+        """
         display_items = self.backend.get_order_items_for_display()
+        articles = [item_data['article'] for item_data in display_items]
+
+        # Удаляем строки товаров, которых больше нет в заказе
+        remaining = set(articles)
+        for article in self.tree.get_children():
+            if article not in remaining:
+                self.tree.delete(article)
+                self.tree_images.pop(article, None)
+                self.tree_rows.pop(article, None)
 
         for item_data in display_items:
-            # РЕШЕНИЕ: Используем более крупные эмодзи-символы
-            # ✅ и ⬜ визуально намного крупнее чем ☑ и ☐
-            checkbox = "✅" if item_data['enabled'] else "⬜"
-
-            photo_image = None
-            if item_data['photo']:
-                try:
-                    rounded_img = create_rounded_image(item_data['photo'], size=(186, 186), corner_radius=15)
-                    if rounded_img:
-                        photo_image = pil_to_photoimage(rounded_img)
-                        self.tree_images[item_data['article']] = photo_image
-                except Exception as e:
-                    print(f"Ошибка обработки изображения для {item_data['article']}: {e}")
-
-            total_sum = item_data['price'] * item_data['quantity']
-
-            values = (
-                checkbox,  # Чекбокс (колонка 1)
-                item_data['article'],  # Артикул (колонка 2)
-                item_data['name'],  # Наименование (колонка 3)
-                f"{item_data['price']:.2f}",  # Цена (колонка 4)
-                item_data['quantity'],  # Количество (колонка 5)
-                item_data['selected_supplier'],  # Поставщик (колонка 6)
-                f"{total_sum:.2f}"  # Сумма (колонка 7)
-            )
+            article = item_data['article']
+            values = self._tree_row_values(item_data)
+
+            if not self.tree.exists(article):
+                # Вставляем элемент БЕЗ тега для сохранения стандартного шрифта
+                self.tree.insert(
+                    "", tk.END,
+                    iid=article,
+                    text="",
+                    values=values,
+                    tags=(article,),
+                    image=self._tree_photo(article)
+                )
+            elif self.tree_rows.get(article) != values:
+                self.tree.item(article, values=values)
+            self.tree_rows[article] = values
+
+        # Порядок строк — как в заказе
+        if list(self.tree.get_children()) != articles:
+            for index, article in enumerate(articles):
+                self.tree.move(article, "", index)
+
+        self.schedule_visible_photos()
+
+    @staticmethod
+    def _tree_row_values(item_data):
+        """Значения колонок строки дерева для позиции заказа."""
+        # РЕШЕНИЕ: Используем более крупные эмодзи-символы
+        # ✅ и ⬜ визуально намного крупнее чем ☑ и ☐
+        checkbox = "✅" if item_data['enabled'] else "⬜"
+        total_sum = item_data['price'] * item_data['quantity']
+        return (
+            checkbox,  # Чекбокс (колонка 1)
+            item_data['article'],  # Артикул (колонка 2)
+            item_data['name'],  # Наименование (колонка 3)
+            f"{item_data['price']:.2f}",  # Цена (колонка 4)
+            item_data['quantity'],  # Количество (колонка 5)
+            item_data['selected_supplier'],  # Поставщик (колонка 6)
+            f"{total_sum:.2f}"  # Сумма (колонка 7)
+        )
 
-            # Вставляем элемент БЕЗ тега для сохранения стандартного шрифта
-            item_id = self.tree.insert(
-                "", tk.END,
-                text="",
-                values=values,
-                tags=(item_data['article'],),
-                image=photo_image
-            )
+    @staticmethod
+    def _photo_key(article, version):
+        """Ключ кэша фото: (артикул, версия файла фото, размер, радиус скругления)."""
+        return (article, version, TREE_PHOTO_CONFIG['size'], TREE_PHOTO_CONFIG['corner_radius'])
+
+    def _tree_photo(self, article):
+        """
+        Фото строки из кэша по последней известной версии файла или заглушка.
+        Фото из кэша показывается сразу, актуальность версии проверяется в фоне.
+        """
+        if article not in self.photo_versions:
+            return self.photo_placeholder
+        version = self.photo_versions[article]
+        photo = self.photo_cache.get(self._photo_key(article, version))
+        if photo is None:
+            return self.photo_placeholder
+        self.tree_images[article] = (version, photo)
+        return photo
+
+    def on_tree_scroll(self, first, last):
+        """Прокрутка дерева: обновление полосы прокрутки и загрузка фото видимых строк"""
+        self.tree_scrollbar.set(first, last)
+        self.schedule_visible_photos()
+
+    def schedule_visible_photos(self):
+        """Отложенная (одна на цикл событий) проверка фото видимых строк"""
+        if self.visible_photos_id is None:
+            self.visible_photos_id = self.root.after_idle(self.load_visible_photos)
+
+    def load_visible_photos(self):
+        """
+        Запуск фоновой проверки и загрузки фото для видимых строк и нескольких соседних.
+        Версия файла определяется в фоновом потоке — в потоке Tk файлы не читаются.
+        """
+        self.visible_photos_id = None
+        children = self.tree.get_children()
+        if not children:
+            return
+
+        visible_rows = max(1, self.tree.winfo_height() // TREE_PHOTO_CONFIG['row_height']) + 1
+        first = int(self.tree.yview()[0] * len(children))
+        margin = TREE_PHOTO_CONFIG['prefetch_rows']
+        for article in children[max(0, first - margin):first + visible_rows + margin]:
+            if article in self.photo_futures:
+                continue
+            loaded_version = self.tree_images.get(article, (_NOT_LOADED, None))[0]
+            self.photo_futures[article] = self.photo_executor.submit(self.load_tree_photo, article, loaded_version)
+
+        if self.photo_futures and self.photo_poll_id is None:
+            self.photo_poll_id = self.root.after(TREE_PHOTO_CONFIG['poll_ms'], self.check_tree_photos)
+
+    def load_tree_photo(self, article, loaded_version):
+        """
+        Версия файла фото и скруглённое фото товара (выполняется в фоновом потоке).
+        Если версия совпадает с уже показанной, фото не декодируется.
+
+        :param article: Артикул товара.
+        :param loaded_version: Версия показанного в строке фото или _NOT_LOADED.
+        :return: (версия, PIL.Image или None).
+        """
+        version = self.backend.get_photo_version(article)
+        if version == loaded_version:
+            return version, None
+        photo = self.backend.get_item_photo(article)
+        if photo is None:
+            return version, None
+        return version, create_rounded_image(photo, size=TREE_PHOTO_CONFIG['size'],
+                                             corner_radius=TREE_PHOTO_CONFIG['corner_radius'])
+
+    def check_tree_photos(self):
+        """Подстановка готовых фото в строки; результаты для удалённых строк и той же версии отбрасываются"""
+        self.photo_poll_id = None
+        done = [article for article, future in self.photo_futures.items() if future.done()]
+        for article in done:
+            future = self.photo_futures.pop(article)
+            try:
+                version, rounded_img = future.result()
+            except Exception as e:
+                print(f"Ошибка обработки изображения для {article}: {e}")
+                continue
+            if not self.tree.exists(article) or self.tree_images.get(article, (_NOT_LOADED, None))[0] == version:
+                continue
+            photo = None
+            try:
+                if rounded_img:
+                    photo = pil_to_photoimage(rounded_img)
+                    self.photo_cache.put(self._photo_key(article, version), photo)
+            except Exception as e:
+                print(f"Ошибка обработки изображения для {article}: {e}")
+            self.photo_versions[article] = version
+            self.tree_images[article] = (version, photo)
+            self.tree.item(article, image=photo or "")
+
+        if self.photo_futures and self.photo_poll_id is None:
+            self.photo_poll_id = self.root.after(TREE_PHOTO_CONFIG['poll_ms'], self.check_tree_photos)
+
+    def on_close(self):
+        """Закрытие окна: отмена отложенных проверок и остановка фоновой загрузки фото"""
+        for after_id in (self.visible_photos_id, self.photo_poll_id):
+            if after_id is not None:
+                self.root.after_cancel(after_id)
+        self.visible_photos_id = self.photo_poll_id = None
+        self.photo_executor.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
 
     def on_tree_single_click(self, event):
         """Обработчик одинарного клика по дереву с новой структурой колонок"""
@@ -1047,7 +1245,7 @@ class PurchaseTableGUI:
         """Переключение чекбокса товара"""
         values = self.tree.item(row)['values']
         if values and len(values) > 1:
-            article = values[1]  # Артикул теперь в позиции 1
+            article = row  # iid строки — артикул
             if self.backend.toggle_item_enabled(article):
                 self.update_tree()
 
@@ -1057,10 +1255,9 @@ class PurchaseTableGUI:
         if not values or len(values) < 2:
             return
 
-        article = values[1]  # Артикул в позиции 1
+        article = row  # iid строки — артикул
 
-        display_items = self.backend.get_order_items_for_display()
-        target_item = next((item for item in display_items if item['article'] == article), None)
+        target_item = self.backend.get_order_item_for_display(article)
         if not target_item:
             return
 
@@ -34,6 +34,23 @@ UI_SIZES = {
     'font_small': ("Arial", 11),
 }
 
+# === Поиск товаров ===
+SEARCH_CONFIG = {
+    'debounce_ms': 150,     # Задержка после последнего нажатия клавиши перед поиском
+    'poll_ms': 30,          # Интервал проверки готовности результата фонового поиска
+}
+
+# === Фото в списке закупки ===
+TREE_PHOTO_CONFIG = {
+    'size': (186, 186),     # Размер скруглённого фото в строке
+    'corner_radius': 15,    # Радиус скругления углов
+    'cache_items': 300,     # Готовых PhotoImage в кэше
+    'row_height': 190,      # Высота строки дерева
+    'prefetch_rows': 2,     # Сколько строк выше и ниже видимой области загружать заранее
+    'placeholder_color': (128, 128, 128),  # Цвет заглушки, пока фото загружается
+    'poll_ms': 30,          # Интервал проверки готовности фото из фонового потока
+}
+
 # === Тексты интерфейса ===
 UI_TEXTS = {
     'title': "Генератор таблиц закупки",
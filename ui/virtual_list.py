@@ -0,0 +1,132 @@
+"""
+Виртуализированный список для Tkinter: в Listbox находятся только видимые строки,
+остальные формируются по мере прокрутки из индексируемого источника данных.
+"""
+import tkinter as tk
+from tkinter import ttk
+import tkinter.font as tkfont
+
+
+class VirtualListbox:
+    """
+    Обёртка над tk.Listbox и ttk.Scrollbar.
+    Источник данных — любая последовательность с len() и доступом по индексу,
+    строки для отображения формирует функция format_item.
+    """
+
+    def __init__(self, parent, format_item, **listbox_options):
+        """
+        :param parent: Родительский виджет.
+        :param format_item: Функция элемент -> строка для отображения.
+        :param listbox_options: Параметры оформления tk.Listbox.
+        """
+        self.format_item = format_item
+        self.items = []
+        self.first = 0              # Индекс первой видимой строки в источнике
+        self.visible_rows = int(listbox_options.get('height', 10))
+        self.selected = None        # Абсолютный индекс выбранной строки
+
+        self.listbox = tk.Listbox(parent, exportselection=False, **listbox_options)
+        self.scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.yview)
+        self.listbox.pack(side=tk.LEFT, fill="both", expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill="y")
+
+        self.line_height = tkfont.Font(font=self.listbox.cget('font')).metrics('linespace') + 1
+
+        self.listbox.bind("<Configure>", self.on_configure)
+        self.listbox.bind("<<ListboxSelect>>", self.on_select)
+        self.listbox.bind("<MouseWheel>", self.on_mousewheel)
+        self.listbox.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.listbox.bind("<Button-5>", lambda e: self.scroll(3))
+        self.listbox.bind("<Up>", lambda e: self.move_selection(-1))
+        self.listbox.bind("<Down>", lambda e: self.move_selection(1))
+        self.listbox.bind("<Prior>", lambda e: self.move_selection(-self.visible_rows))
+        self.listbox.bind("<Next>", lambda e: self.move_selection(self.visible_rows))
+
+    def bind(self, sequence, func):
+        """Привязка события к внутреннему Listbox."""
+        return self.listbox.bind(sequence, func)
+
+    def set_items(self, items):
+        """
+        Замена источника данных. Формируются только видимые строки.
+
+        :param items: Последовательность элементов (len() и доступ по индексу).
+        """
+        self.items = items
+        self.first = 0
+        self.selected = None
+        self.render()
+
+    def curselection(self) -> tuple:
+        """Абсолютный индекс выбранного элемента (совместимо с tk.Listbox.curselection)."""
+        return () if self.selected is None else (self.selected,)
+
+    def render(self):
+        """Перерисовка видимого окна строк."""
+        total = len(self.items)
+        self.first = max(0, min(self.first, total - self.visible_rows))
+        last = min(total, self.first + self.visible_rows)
+
+        self.listbox.delete(0, tk.END)
+        texts = [self.format_item(self.items[index]) for index in range(self.first, last)]
+        if texts:
+            self.listbox.insert(tk.END, *texts)
+        if self.selected is not None and self.first <= self.selected < last:
+            self.listbox.selection_set(self.selected - self.first)
+
+        if total:
+            self.scrollbar.set(self.first / total, last / total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def yview(self, *args):
+        """Обработчик команд полосы прокрутки ('moveto' и 'scroll')."""
+        total = len(self.items)
+        if not args or not total:
+            return
+        if args[0] == 'moveto':
+            self.first = int(float(args[1]) * total)
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            if args[2] == 'pages':
+                step *= self.visible_rows
+            self.first += step
+        self.render()
+
+    def scroll(self, rows):
+        """Прокрутка на заданное количество строк."""
+        self.first += rows
+        self.render()
+        return "break"
+
+    def on_mousewheel(self, event):
+        """Прокрутка колесом мыши (Windows/macOS)."""
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+    def on_configure(self, event):
+        """Пересчёт количества видимых строк при изменении размера."""
+        rows = max(1, event.height // self.line_height)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.render()
+
+    def on_select(self, event):
+        """Запоминание абсолютного индекса выбранной строки."""
+        selection = self.listbox.curselection()
+        if selection:
+            self.selected = self.first + selection[0]
+
+    def move_selection(self, delta):
+        """Перемещение выделения клавишами с прокруткой окна."""
+        total = len(self.items)
+        if not total:
+            return "break"
+        current = self.selected if self.selected is not None else self.first - 1
+        self.selected = max(0, min(total - 1, current + delta))
+        if self.selected < self.first:
+            self.first = self.selected
+        elif self.selected >= self.first + self.visible_rows:
+            self.first = self.selected - self.visible_rows + 1
+        self.render()
+        return "break"
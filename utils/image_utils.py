@@ -1,36 +1,67 @@
 # utils/image_utils.py
-from PIL import Image, ImageDraw
-import tkinter as tk
-import io
+from collections import OrderedDict
+from functools import lru_cache
+from PIL import Image, ImageDraw, ImageTk
+
+
+@lru_cache(maxsize=8)
+def rounded_mask(size=(186, 186), corner_radius=10):
+    """Маска со скруглёнными углами; строится один раз для каждого размера и радиуса."""
+    mask = Image.new('L', size, 0)
+    draw = ImageDraw.Draw(mask)
+    draw.rounded_rectangle([0, 0, size[0], size[1]], corner_radius, fill=255)
+    return mask
 
 def create_rounded_image(image, size=(186, 186), corner_radius=10):
-    """Создаёт скруглённое изображение заданного размера."""
+    """Создаёт скруглённое изображение заданного размера. Исходное изображение не изменяется."""
     if image is None:
         return None
 
-    # Изменяем размер с сохранением пропорций
-    image.thumbnail(size, Image.Resampling.LANCZOS)
+    # Изменяем размер копии с сохранением пропорций
+    fitted = image.copy()
+    fitted.thumbnail(size, Image.Resampling.LANCZOS)
     new_image = Image.new("RGBA", size, (0, 0, 0, 0))
-    paste_x = (size[0] - image.width) // 2
-    paste_y = (size[1] - image.height) // 2
-    new_image.paste(image.convert("RGBA"), (paste_x, paste_y))
-
-    # Создаём маску со скруглёнными углами
-    mask = Image.new('L', size, 0)
-    draw = ImageDraw.Draw(mask)
-    draw.rounded_rectangle([0, 0, size[0], size[1]], corner_radius, fill=255)
+    paste_x = (size[0] - fitted.width) // 2
+    paste_y = (size[1] - fitted.height) // 2
+    new_image.paste(fitted.convert("RGBA"), (paste_x, paste_y))
 
     # Применяем маску
     result = Image.new('RGBA', size, (0, 0, 0, 0))
-    result.paste(new_image, (0, 0), mask)
+    result.paste(new_image, (0, 0), rounded_mask(size, corner_radius))
 
     return result
 
 def pil_to_photoimage(pil_image):
-    """Конвертирует PIL.Image в PhotoImage для Tkinter."""
+    """Конвертирует PIL.Image в PhotoImage для Tkinter прямой передачей пикселей (без PNG)."""
     if pil_image is None:
         return None
-    with io.BytesIO() as output:
-        pil_image.save(output, format="PNG")
-        data = output.getvalue()
-    return tk.PhotoImage(data=data)
\ No newline at end of file
+    return ImageTk.PhotoImage(pil_image)
+
+
+class PhotoImageCache:
+    """
+    LRU-кэш готовых PhotoImage для Tkinter.
+    Ключ — (артикул, время изменения фото, размер, радиус скругления), поэтому изменённое фото
+    или другой размер дают новую запись. Используется только из потока Tk.
+    """
+
+    def __init__(self, max_items=300):
+        """
+        :param max_items: Максимальное количество изображений в кэше.
+        """
+        self.max_items = max_items
+        self._items = OrderedDict()
+
+    def get(self, key):
+        """PhotoImage по ключу или None."""
+        photo = self._items.get(key)
+        if photo is not None:
+            self._items.move_to_end(key)
+        return photo
+
+    def put(self, key, photo):
+        """Сохранить PhotoImage, вытесняя давно не использованные."""
+        self._items[key] = photo
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)